@@ -296,35 +296,41 @@ def halfhalfditherimage(image, width, height, palette):
     if width <= 0 or height <= 0 or not palette:
         raise ValueError
     cdcolors = _getdithercolors(palette)
+    # Unpack each color's two dither choices into byte triples
+    # up front, so that the pixel loop is a lookup and a slice write
+    lut = {}
+    for k, cd in cdcolors.items():
+        if not cd:
+            raise ValueError
+        lut[k] = tuple(
+            (c & 0xFF, (c >> 8) & 0xFF, (c >> 16) & 0xFF) for c in cd[:2]
+        )
+    i = 0
     for y in range(height):
-        yd = y * width
+        parity = y & 1
         for x in range(width):
-            xp = yd + x
-            col = image[xp * 3] | (image[xp * 3 + 1] << 8) | (image[xp * 3 + 2] << 16)
-            cd = cdcolors[col]
-            if not cd:
-                raise ValueError
-            col = cd[0] if (x + y) % 2 == 0 else cd[1]
-            image[xp * 3] = col & 0xFF
-            image[xp * 3 + 1] = (col >> 8) & 0xFF
-            image[xp * 3 + 2] = (col >> 16) & 0xFF
+            col = image[i] | (image[i + 1] << 8) | (image[i + 2] << 16)
+            image[i : i + 3] = lut[col][(x & 1) ^ parity]
+            i += 3
 
 # Returns a list of the unique colors in an image (disregarding
 # the alpha channel, if any).  The return value has the same
 # format returned in the _reados2palette_ function.
 def uniquecolors(image, width, height, alpha=False):
-    colors = {}
     bytesperpixel = 4 if alpha else 3
-    for i in range(width * height):
-        c = (
-            image[i * bytesperpixel]
-            | (image[i * bytesperpixel + 1] << 8)
-            | (image[i * bytesperpixel + 2] << 16)
+    size = width * height * bytesperpixel
+    if len(image) < size:
+        raise ValueError("len=%d width=%d height=%d" % (len(image), width, height))
+    # Gather the colors from the image's three color channels, each read
+    # with a strided slice
+    colors = set(
+        zip(
+            image[0:size:bytesperpixel],
+            image[1:size:bytesperpixel],
+            image[2:size:bytesperpixel],
         )
-        colors[c] = True
-    ck = [[k & 0xFF, (k >> 8) & 0xFF, (k >> 16) & 0xFF] for k in colors.keys()]
-    ck.sort()
-    return ck
+    )
+    return [list(c) for c in sorted(colors)]
 
 def _isqrtceil(i):
     r = math.isqrt(i)
@@ -343,9 +349,12 @@ def _isqrtceil(i):
 # given in 'basecolors', which is a list
 # of colors (each color is of the same format as rgb1 and rgb2).  If 'dither' is also True, the
 # image's colors are then scattered so that they appear close to the original colors.
+# If 'ordered' is also True, the scattering uses an 8 &times; 8 ordered dither
+# (which is cheaper than error diffusion and keeps tiles seamless) rather than
+# Floyd-Steinberg error diffusion.
 # Raises an error if 'basecolors' has a length greater than 256.
 def magickgradientditherfilter(
-    rgb1=None, rgb2=None, basecolors=None, hue=0, dither=True
+    rgb1=None, rgb2=None, basecolors=None, hue=0, dither=True, ordered=False
 ):
     if hue < -180 or hue > 180:
         raise ValueError
@@ -390,26 +399,27 @@ def magickgradientditherfilter(
             + bases
             + ["+append", "-write", "mpr:z", "+delete", ")"]
         )
-        # Apply Floyd-Steinberg error diffusion dither.
-        # NOTE: For abstractImage = True, ImageMagick's ordered 8 &times; 8 dithering
-        # algorithm ("-ordered-dither 8x8") is by default a per-channel monochrome
+        # NOTE: ImageMagick's ordered 8 &times; 8 dithering
+        # algorithm ("-ordered-dither o8x8") is by default a per-channel monochrome
         # (2-level) dither, not a true color dithering approach that takes much
         # account of the color palette.
         # As a result, for example, dithering a grayscale image with the algorithm will
         # lead to an image with only black and white pixels, even if the palette contains,
-        # say, ten shades of gray.  The number after "8x8" is the number of color levels
+        # say, ten shades of gray.  The number after "o8x8" is the number of color levels
         # per color channel in the ordered dither algorithm, and this number is taken
         # as the square root of the palette size, rounded up, minus 1, but not less
-        # than 2.
-        # ditherkind = (
-        #    "-ordered-dither 8x8,%d" % (min(2, _isqrtceil(len(basecolors)) - 1))
-        #    if abstractImage
-        #    else "-dither FloydSteinberg"
-        # )
-        # "+dither" disables dithering
-        if dither:
+        # than 2.  The "o8x8" threshold map is the same Bayer matrix as _DitherMatrix
+        # (transposed), so no external threshold map is needed.
+        # The ordered dither's output is then mapped to the palette without
+        # further dithering.
+        if dither and ordered:
+            levels = max(2, _isqrtceil(len(basecolors)) - 1)
+            ret += ["-ordered-dither", "o8x8,%d" % (levels), "+dither"]
+        elif dither:
+            # Apply Floyd-Steinberg error diffusion dither.
             ret += ["-dither", "FloydSteinberg"]
         else:
+            # "+dither" disables dithering
             ret += ["+dither"]
         ret += ["-remap", "mpr:z"]
     return ret
@@ -922,6 +932,16 @@ def groupPmg():
 # around the time of either OS's release.
 def brushedmetal():
     sz = 50
+    # The horizontal box blur over 'sz' pixels is done in two passes that
+    # give the same average with fewer samples per pixel: a box blur over
+    # 'inner' pixels, then an average of 'sz/inner' samples of that blur,
+    # each 'inner' pixels apart.  In the second kernel, "-" marks
+    # positions that aren't sampled.
+    inner = 10
+    outer = [
+        str(1 / (sz // inner)) if i % inner == 0 else "-"
+        for i in range(sz - inner + 1)
+    ]
     return [
         "(",
         "+clone",
@@ -929,7 +949,10 @@ def brushedmetal():
         "+append",
         "-morphology",
         "Convolve",
-        ("%dx1+%d+0:" % (sz, sz - 1)) + (",".join([str(1 / sz) for i in range(sz)])),
+        ("%dx1+%d+0:" % (inner, inner - 1)) + (",".join([str(1 / inner)] * inner)),
+        "-morphology",
+        "Convolve",
+        ("%dx1+%d+0:" % (len(outer), len(outer) - 1)) + (",".join(outer)),
         "+repage",
         "-crop",
         "50%x0+0+0",
@@ -937,9 +960,38 @@ def brushedmetal():
     ]
 
 def simplebox(image, width, height, color, x0, y0, x1, y1, wraparound=True):
-    borderedbox(
-        image, width, height, None, color, color, x0, y0, x1, y1, wraparound=wraparound
-    )
+    if x1 < x0 or y1 < y0:
+        raise ValueError
+    if width < 0 or height < 0:
+        raise ValueError
+    # Nothing to do for zero-width images
+    if width == 0 or height == 0:
+        return
+    if (not color) or (not image):
+        raise ValueError
+    if x0 == x1 or y0 == y1:
+        return
+    if not wraparound:
+        x0 = max(x0, 0)
+        y0 = max(y0, 0)
+        x1 = min(x1, width)
+        y1 = min(y1, height)
+        if x0 >= x1 or y0 >= y1:
+            return
+    # Every pixel gets the same color, so fill each affected row once,
+    # in at most two contiguous runs (two if the box wraps around)
+    rowcount = min(y1 - y0, height)
+    if x1 - x0 >= width:
+        runs = [(0, width)]
+    else:
+        xs = x0 % width
+        xe = xs + (x1 - x0)
+        runs = [(xs, xe)] if xe <= width else [(xs, width), (0, xe - width)]
+    pixel = [color[0], color[1], color[2]]
+    for y in range(y0, y0 + rowcount):
+        yp = (y % height) * width * 3
+        for xs, xe in runs:
+            image[yp + xs * 3 : yp + xe * 3] = pixel * (xe - xs)
 
 # Draw a wraparound hatched box on an image.
 # Image has the same format returned by the blankimage() method with alpha=False.
@@ -990,166 +1042,284 @@ def hatchedbox(
         y1 = min(y1, height)
         if x0 >= x1 or y0 >= y1:
             return
-    for y in range(y0, y1):
+    # The pattern's bits as an 8 &times; 8 table, by row then column
+    bits = [
+        [(row >> ((7 - c) if msbfirst else c)) & 1 for c in range(8)]
+        for row in pattern[:8]
+    ]
+    # The columns' positions and pattern columns are the same
+    # for every row, so find them once
+    xps = [x % width for x in range(x0, x1)]
+    columns = [(xp * 3, xp & 7) for xp in xps]
+    # Contiguous runs of the box's columns, for filling whole rows
+    spans = [
+        (dx * 3, (dx + count) * 3, [cr, cg, cb] * count)
+        for dx, _, count in _wrapruns(x0, x1, width)
+    ]
+    # On a bytearray, each run of a row is drawn at once by packing its
+    # bytes into one integer; the row's mask of pixels to draw (all ones
+    # for drawn pixels, all zeros otherwise) gives the run's new bytes as
+    # (mask & color) | (~mask & run).  Converting a list's run to bytes
+    # costs more than drawing its pixels one by one.
+    packed = isinstance(image, bytearray)
+    if packed:
+        colors = [int.from_bytes(bytes(fill), "big") for _, _, fill in spans]
+    # Every pixel drawn gets the same color, so rows of the box that
+    # wrap onto the same image row need be drawn only once
+    borderrows = (y0 % height, (y1 - 1) % height) if drawborder else ()
+    # Pattern rows with all bits set are drawn like border rows, and
+    # those with none set draw nothing but the border columns
+    fullrows = [all(row) for row in bits]
+    emptyrows = [not any(row) for row in bits]
+    hatches = [None] * 8
+    for y in range(y0, min(y1, y0 + height)):
         ypp = y % height
+        if emptyrows[ypp & 7] and not drawborder:
+            continue
         yp = ypp * width * 3
-        for x in range(x0, x1):
-            xp = x % width
-            c = (
-                ((pattern[ypp & 7] >> (7 - (xp & 7))) & 1)
-                if msbfirst
-                else ((pattern[ypp & 7] >> (xp & 7)) & 1)
-            )
-            if (
-                drawborder and (y == y0 or y == y1 - 1 or x == x0 or x == x1 - 1)
-            ) or c == 1:
-                # Draw hatch color
-                image[yp + xp * 3] = cr
-                image[yp + xp * 3 + 1] = cg
-                image[yp + xp * 3 + 2] = cb
+        if ypp in borderrows or fullrows[ypp & 7]:
+            # Border row; draw hatch color across the whole row
+            for xs, xe, fill in spans:
+                image[yp + xs : yp + xe] = fill
+            continue
+        # The pattern has only eight distinct rows; find the hatch pixels
+        # (or, on a bytearray, the runs' masks) of each row the first time
+        # it's needed
+        hatch = hatches[ypp & 7]
+        if hatch is None:
+            row = bits[ypp & 7]
+            hatch = [xo for xo, c in columns if row[c]]
+            if drawborder:
+                hatch += [xps[0] * 3, xps[-1] * 3]
+            if packed:
+                drawn = bytearray(width * 3)
+                for xo in hatch:
+                    drawn[xo : xo + 3] = b"\xff\xff\xff"
+                hatch = [
+                    int.from_bytes(drawn[xs:xe], "big") for xs, xe, _ in spans
+                ]
+            hatches[ypp & 7] = hatch
+        if packed:
+            for (xs, xe, _), mask, color in zip(spans, hatch, colors):
+                run = int.from_bytes(image[yp + xs : yp + xe], "big")
+                run = (mask & color) | (~mask & run)
+                image[yp + xs : yp + xe] = run.to_bytes(xe - xs, "big")
+            continue
+        for xo in hatch:
+            # Draw hatch color
+            image[yp + xo] = cr
+            image[yp + xo + 1] = cg
+            image[yp + xo + 2] = cb
 
 # Apply a binary raster operation to two 8-bit source and destination
 # color channels.
 # 'dst' and 'src' are each 8-bit integers (from 0 through 255).
 # 'rop' is a 4-bit binary raster operation (from 0 through 15).
+# Bit 0 of 'rop' gives the result bit where the source and destination
+# bits are both 0; bit 1, where only the destination bit is 1; bit 2, where
+# only the source bit is 1; and bit 3, where both are 1.
+# Assuming the source and destination
+# images are black-and-white (where 0-bits represent black,
+# and 1-bits white), the result of
+# each raster operation is as follows:
+# 0: Turn destination black.
+# 1: Also known as "not source erase" or "not merge pen".
+#   Inversion of operation code 14.
+#   Result's white area is the intersection of black areas
+#   of the source and destination.  That is, the result pixel
+#   is white only if both the source and destination
+#   pixels are black.  Alternatively, the black area is
+#   the union of white areas of the source and destination.
+#   Alternatively, if the source is black-and-white and the
+#   destination is colored: The white area of the source is
+#   copied to the destination and turned black there, and
+#   if the source pixel is black, the destination color is
+#   inverted.
+# 2: Also known as "mask not pen".
+#   Inversion of operation code 13.
+#   The result pixel is white only if the source pixel is black
+#   and the destination pixel is white.
+#   The result pixel is black only if the source pixel is white,
+#   the destination pixel is black, or both.
+# 3: Also known as "not source copy" or "not copy pen".
+#   Copy inverted source colors to destination.
+#   If source and destination are black-and-white:
+#   If source pixel is black, white is copied
+#   to the destination, and vice versa.
+# 4: Also known as "source erase" or "mask pen not".
+#   Inversion of operation code 11.
+#   The result pixel is white only if the source pixel is white
+#   and the destination pixel is black.
+#   The result pixel is black only if the source pixel is black,
+#   the destination pixel is white, or both.
+# 5: Also known as "destination invert".
+#   Invert colors of destination.
+#   If destination is black-and-white, turns
+#   white destination pixels black and vice versa.
+# 6: Also known as "source invert" or "XOR pen".
+#   The result pixel is white if the source pixel is black
+#   and the destination pixel is white or vice versa, and the result
+#   pixel is black if the source and destination pixels are
+#   the same.  Alternatively, if the source and destination
+#   are colored: Where the source color is black, the destination
+#   is left unchanged, and where the _destination_ color is
+#   black, the source color is copied to the destination.
+# 7: Also known as "not mask pen".
+#   Result's white area is the intersection of white areas
+#   of the source and destination.  That is, the result pixel
+#   is white only if the source and destination pixels are
+#   both white.  Alternatively, the black area is the union
+#   of black areas of the source and destination.
+#   Alternatively, if the source is black-and-white and the
+#   destination is colored, the black area of the source is
+#   copied to the destination and turned white there, and where
+#   the source pixel color is white, the destination color is
+#   inverted.
+# 8: Also known as "source AND".
+#   Result's white area is the intersection of white areas
+#   of the source and destination.  That is, the result pixel
+#   is white only if the source and destination pixels are
+#   both white.  Alternatively, the black area is the union
+#   of black areas of the source and destination.
+#   Alternatively, if the source is black-and-white and the
+#   destination is colored, the black area of the source is
+#   copied to the destination (and left black there).
+# 9: Also known as "not XOR pen".
+#   Inversion of operation code 6.
+#   The result pixel is black if the source pixel is black
+#   and the destination is white or vice versa, and the result
+#   pixel is white if the source and destination pixels are
+#   the same. Alternatively, if the source and destination
+#   are colored: Where the source color is white, the destination
+#   is left unchanged, and where the _destination_ color is
+#   white, the source color is copied to the destination.
+# 10: Also known as "no-op".
+#   Leave destination unchanged.
+# 11: Also known as "merge paint" or "merge not pen".
+#   Inversion of operation code 4.
+#   The result pixel is black only if the source pixel is white
+#   and the destination pixel is black.
+#   The result pixel is white only if the source pixel is black,
+#   the destination pixel is white, or both.
+# 12: Also known as "source copy".
+#   Copy source to destination.
+# 13: Also known as "merge pen not".
+#   Inversion of operation code 2.
+#   The result pixel is black only if the source pixel is black
+#   and the destination pixel is white.
+#   The result pixel is white only if the source pixel is white,
+#   the destination pixel is black, or both.
+# 14: Also known as "source paint" or "merge pen".
+#   Result's white area is the union of white areas
+#   of the source and destination.  That is, the result pixel
+#   is white only if the source pixel, the destination
+#   pixel, or both are white.  Alternatively, the black area is
+#   the intersection of black areas of the source and destination.
+#   Alternatively, if the source is black-and-white and the
+#   destination is colored, the white area of the source is
+#   copied to the destination (and left white there).
+# 15: Turn destination white.
 def _applyrop(dst, src, rop):
-    # Assuming the source and destination
-    # images are black-and-white (where 0-bits represent black,
-    # and 1-bits white), the result of
-    # each raster operation is as follows:
-    match rop:
-        case 12:
-            # Also known as "source copy".
-            # Copy source to destination.
-            return src
-        case 10:
-            # Also known as "no-op".
-            # Leave destination unchanged.
-            return dst
-        case 0:
-            # Turn destination black.
-            return 0
-        case 1:
-            # Also known as "not source erase" or "not merge pen".
-            # Inversion of operation code 14.
-            # Result's white area is the intersection of black areas
-            # of the source and destination.  That is, the result pixel
-            # is white only if both the source and destination
-            # pixels are black.  Alternatively, the black area is
-            # the union of white areas of the source and destination.
-            # Alternatively, if the source is black-and-white and the
-            # destination is colored: The white area of the source is
-            # copied to the destination and turned black there, and
-            # if the source pixel is black, the destination color is
-            # inverted.
-            return (dst | src) ^ 0xFF
-        case 2:
-            # Also known as "mask not pen".
-            # Inversion of operation code 13.
-            # The result pixel is white only if the source pixel is black
-            # and the destination pixel is white.
-            # The result pixel is black only if the source pixel is white,
-            # the destination pixel is black, or both.
-            return dst & (src ^ 0xFF)
-        case 3:
-            # Also known as "not source copy" or "not copy pen".
-            # Copy inverted source colors to destination.
-            # If source and destination are black-and-white:
-            # If source pixel is black, white is copied
-            # to the destination, and vice versa.
-            return src ^ 0xFF
-        case 4:
-            # Also known as "source erase" or "mask pen not".
-            # Inversion of operation code 11.
-            # The result pixel is white only if the source pixel is white
-            # and the destination pixel is black.
-            # The result pixel is black only if the source pixel is black,
-            # the destination pixel is white, or both.
-            return src & (dst ^ 0xFF)
-        case 5:
-            # Also known as "destination invert".
-            # Invert colors of destination.
-            # If destination is black-and-white, turns
-            # white destination pixels black and vice versa.
-            return dst ^ 0xFF
-        case 6:
-            # Also known as "source invert" or "XOR pen".
-            # The result pixel is white if the source pixel is black
-            # and the destination pixel is white or vice versa, and the result
-            # pixel is black if the source and destination pixels are
-            # the same.  Alternatively, if the source and destination
-            # are colored: Where the source color is black, the destination
-            # is left unchanged, and where the _destination_ color is
-            # black, the source color is copied to the destination.
-            return dst ^ src
-        case 7:
-            # Also known as "not mask pen".
-            # Result's white area is the intersection of white areas
-            # of the source and destination.  That is, the result pixel
-            # is white only if the source and destination pixels are
-            # both white.  Alternatively, the black area is the union
-            # of black areas of the source and destination.
-            # Alternatively, if the source is black-and-white and the
-            # destination is colored, the black area of the source is
-            # copied to the destination and turned white there, and where
-            # the source pixel color is white, the destination color is
-            # inverted.
-            return (dst & src) ^ 0xFF
-        case 8:
-            # Also known as "source AND".
-            # Result's white area is the intersection of white areas
-            # of the source and destination.  That is, the result pixel
-            # is white only if the source and destination pixels are
-            # both white.  Alternatively, the black area is the union
-            # of black areas of the source and destination.
-            # Alternatively, if the source is black-and-white and the
-            # destination is colored, the black area of the source is
-            # copied to the destination (and left black there).
-            return dst & src
-        case 9:
-            # Also known as "not XOR pen".
-            # Inversion of operation code 6.
-            # The result pixel is black if the source pixel is black
-            # and the destination is white or vice versa, and the result
-            # pixel is white if the source and destination pixels are
-            # the same. Alternatively, if the source and destination
-            # are colored: Where the source color is white, the destination
-            # is left unchanged, and where the _destination_ color is
-            # white, the source color is copied to the destination.
-            return (dst ^ src) ^ 0xFF
-        case 11:
-            # Also known as "merge paint" or "merge not pen".
-            # Inversion of operation code 4.
-            # The result pixel is black only if the source pixel is white
-            # and the destination pixel is black.
-            # The result pixel is white only if the source pixel is black,
-            # the destination pixel is white, or both.
-            return (src & (dst ^ 0xFF)) ^ 0xFF
-        case 13:
-            # Also known as "merge pen not".
-            # Inversion of operation code 2.
-            # The result pixel is black only if the source pixel is black
-            # and the destination pixel is white.
-            # The result pixel is white only if the source pixel is white,
-            # the destination pixel is black, or both.
-            return (dst & (src ^ 0xFF)) ^ 0xFF
-        case 14:
-            # Also known as "source paint" or "merge pen".
-            # Result's white area is the union of white areas
-            # of the source and destination.  That is, the result pixel
-            # is white only if the source pixel, the destination
-            # pixel, or both are white.  Alternatively, the black area is
-            # the intersection of black areas of the source and destination.
-            # Alternatively, if the source is black-and-white and the
-            # destination is colored, the white area of the source is
-            # copied to the destination (and left white there).
-            return dst | src
-        case 15:
-            # Turn destination white.
-            return 0xFF
-        case _:
-            # Undefined raster operation.
-            return 0
+    if rop < 0 or rop > 15:
+        # Undefined raster operation.
+        return 0
+    # Combine the four truth table entries as bit masks, all
+    # eight bits at once; -(bit) is all ones if the bit is set.
+    ndst = dst ^ 0xFF
+    nsrc = src ^ 0xFF
+    return (
+        (ndst & nsrc & -(rop & 1))
+        | (dst & nsrc & -((rop >> 1) & 1))
+        | (ndst & src & -((rop >> 2) & 1))
+        | (dst & src & -((rop >> 3) & 1))
+    )
+
+# The binary raster operations of _applyrop() as Python expressions in
+# the destination and source, indexed by operation code.
+# 'ones' is an integer with all bits set (0xFF for single 8-bit
+# channels); the expressions then work equally well on many channels
+# packed into one integer.
+_BinaryRopExprs = [
+    "0",
+    "(dst | src) ^ ones",
+    "dst & (src ^ ones)",
+    "src ^ ones",
+    "src & (dst ^ ones)",
+    "dst ^ ones",
+    "dst ^ src",
+    "(dst & src) ^ ones",
+    "dst & src",
+    "(dst ^ src) ^ ones",
+    "dst",
+    "(src & (dst ^ ones)) ^ ones",
+    "src",
+    "(dst & (src ^ ones)) ^ ones",
+    "dst | src",
+    "ones",
+]
+
+# The binary raster operations as functions of the destination, source,
+# and 'ones', so that a blit can pick its operations once rather than
+# dispatching on every call.
+_BinaryRops = [eval("lambda dst, src, ones: " + e) for e in _BinaryRopExprs]
+
+# Split the columns x0 through x1 (exclusive) of a row into runs of pixels
+# that are contiguous in an image of the given width and in which no pixel
+# occurs twice (so that drawing the runs in order has the same effect as
+# drawing the pixels one at a time).  Returns a list of runs, each a list of
+# the run's first column in the image, its offset from x0, and its size in pixels.
+def _wrapruns(x0, x1, width, wraparound=True):
+    runs = []
+    if wraparound:
+        x = 0
+        while x < x1 - x0:
+            dx = (x0 + x) % width
+            count = min(width - dx, x1 - x0 - x)
+            runs.append([dx, x, count])
+            x += count
+    else:
+        xstart = max(x0, 0)
+        xend = min(x1, width)
+        if xstart < xend:
+            runs.append([xstart, xstart - x0, xend - xstart])
+    return runs
+
+# List the rows y0 through y1 (exclusive) that are drawn on an image of the
+# given height, in order, each as its row in the image and its offset from y0.
+def _wraprows(y0, y1, height, wraparound=True):
+    return [
+        (dy + i, y + i)
+        for dy, y, count in _wrapruns(y0, y1, height, wraparound)
+        for i in range(count)
+    ]
+
+# Returns a function that applies a ternary raster operation to the
+# destination, source, and pattern bits given as integers ('rop' is from
+# 0 through 255; see imageblitex()).  The function takes the destination,
+# source, pattern, and 'ones' (as for _BinaryRops), in that order.
+# The function is compiled from a single expression, specialized to the
+# operation, so that it calls no other functions.
+def _ternaryrop(rop):
+    low = rop & 0xF
+    high = (rop >> 4) & 0xF
+    lowexpr = _BinaryRopExprs[low]
+    highexpr = _BinaryRopExprs[high]
+    if low == high:
+        # The pattern doesn't matter
+        expr = lowexpr
+    elif low == 0:
+        expr = "pat & (%s)" % highexpr
+    elif high == 0:
+        expr = "(pat ^ ones) & (%s)" % lowexpr
+    elif high == low ^ 0xF:
+        # Where the pattern is set, the other operation's result is inverted
+        expr = "pat ^ (%s)" % lowexpr
+    else:
+        expr = "(pat & (%s)) ^ ((pat ^ ones) & (%s))" % (highexpr, lowexpr)
+    return eval("lambda dst, src, pat, ones: " + expr)
+
+# Functions for the 256 ternary raster operations, built once
+_TernaryRops = [_ternaryrop(rop) for rop in range(256)]
 
 # Draw a wraparound copy of an image on another image.
 # 'dstimage' and 'srcimage' are the destination and source images.
@@ -1225,6 +1395,10 @@ def _applyrop(dst, src, rop):
 # pixel's bits to all zeros.
 # 0xF0: Pattern copy.
 # 0xFB: "Pattern paint".
+# 0x78: Pattern XOR (source AND destination).  With an AND mask as the source
+# and an XOR mask as the pattern, this draws an icon or cursor in a single
+# pass rather than as two blits (0x88 with the AND mask, then 0x66 with the
+# XOR mask).
 #
 # 'maskimage' is ideally a monochrome image (every pixel's bits are either all zeros
 # [black] or all ones [white]), but it doesn't have to be.
@@ -1313,7 +1487,23 @@ def imageblitex(
         # Destination left unchanged
         return
     if srcimage is dstimage or patternimage is dstimage or maskimage is dstimage:
-        # Avoid overlapping source/pattern/mask with destination
+        # Avoid overlapping source/pattern/mask with destination.  Only
+        # the source and mask rows that the blit reads are copied.
+        pixelsize = 4 if alpha else 3
+        if srcimage is dstimage:
+            rowsize = srcwidth * pixelsize
+            srcimage = srcimage[y0src * rowsize : y1src * rowsize] if srcimage else None
+            srcheight = y1src - y0src
+            y0src = 0
+        if patternimage is dstimage:
+            patternimage = patternimage[:] if patternimage else None
+        if maskimage is dstimage:
+            rowsize = maskwidth * pixelsize
+            maskimage = (
+                maskimage[y0mask * rowsize : y1mask * rowsize] if maskimage else None
+            )
+            maskheight = y1mask - y0mask
+            y0mask = 0
         return imageblitex(
             dstimage,
             dstwidth,
@@ -1322,29 +1512,17 @@ def imageblitex(
             y0,
             x1,
             y1,
-            (
-                srcimage
-                if srcimage is not dstimage
-                else ([x for x in srcimage] if srcimage else None)
-            ),
+            srcimage,
             srcwidth,
             srcheight,
             x0src,
             y0src,
-            (
-                patternimage
-                if patternimage is not dstimage
-                else ([x for x in patternimage] if patternimage else None)
-            ),
+            patternimage,
             patternwidth,
             patternheight,
             patternOrgX,
             patternOrgY,
-            (
-                maskimage
-                if maskimage is not dstimage
-                else ([x for x in maskimage] if maskimage else None)
-            ),
+            maskimage,
             maskwidth,
             maskheight,
             x0mask,
@@ -1354,49 +1532,87 @@ def imageblitex(
             wraparound,
             alpha=alpha,
         )
+    if x0 == x1 or y0 == y1:
+        return
     pixelsize = 4 if alpha else 3
-    for y in range(y1 - y0):
-        dy = y0 + y
-        if wraparound:
-            dy %= dstheight
-        if (not wraparound) and dy < 0 or dy >= dstheight:
-            continue
-        sy = (y0src + y) * srcwidth * pixelsize if srcimage else 0
-        paty = (
-            (((dy - patternOrgY) % patternheight) * patternwidth * pixelsize)
-            if patternimage
-            else 0
+    # Whether the raster operations read the destination and
+    # source at all; if not, those images need not be read
+    rops = ropForeground | (ropBackground << 8)
+    needDestination = (((rops >> 1) ^ rops) & 0x5555) != 0
+    needSource = (((rops >> 2) ^ rops) & 0x3333) != 0
+    # Plain source copy, the most common operation, needs no arithmetic
+    sourceCopy = ropForeground == 0xCC and ropBackground == 0xCC and srcimage
+    ropfg = _TernaryRops[ropForeground]
+    ropbg = _TernaryRops[ropBackground]
+    # Since raster operations work bit by bit, each run of a row is
+    # handled at once by packing its channels into one integer.
+    # The runs are the same for every row, so their offsets into
+    # the destination, source, mask, and pattern rows are found once.
+    runs = [
+        (
+            dx * pixelsize,
+            (x0src + x) * pixelsize,
+            (x0mask + x) * pixelsize,
+            ((dx - patternOrgX) % patternwidth) * pixelsize if patternimage else 0,
+            count * pixelsize,
+            (1 << (count * pixelsize * 8)) - 1,
         )
+        for dx, x, count in _wrapruns(x0, x1, dstwidth, wraparound)
+    ]
+    # Rows don't depend on each other, so if a row's only run spans whole
+    # rows of every image read, rows that are consecutive in the destination
+    # are drawn together as one run
+    rowsize = dstwidth * pixelsize
+    together = (
+        len(runs) == 1
+        and runs[0][4] == rowsize
+        and not patternimage
+        and ((not srcimage) or srcwidth * pixelsize == rowsize)
+        and ((not maskimage) or maskwidth * pixelsize == rowsize)
+    )
+    if together:
+        rows = _wrapruns(y0, y1, dstheight, wraparound)
+    else:
+        rows = [(dy, y, 1) for dy, y in _wraprows(y0, y1, dstheight, wraparound)]
+    # Packed pattern bytes for each run, by pattern row
+    patterncache = {}
+    for dy, y, rowcount in rows:
+        sy = (y0src + y) * srcwidth * pixelsize if srcimage else 0
+        if patternimage:
+            paty = ((dy - patternOrgY) % patternheight) * patternwidth * pixelsize
+            patterns = patterncache.get(paty)
+            if patterns is None:
+                # Repeat the pattern row, starting at each run's phase
+                patrow = patternimage[paty : paty + patternwidth * pixelsize]
+                patterns = []
+                for _, _, _, patpos, size, _ in runs:
+                    tile = patrow * ((patpos + size + len(patrow) - 1) // len(patrow))
+                    patterns.append(int.from_bytes(tile[patpos : patpos + size], "big"))
+                patterncache[paty] = patterns
         masky = (y0mask + y) * maskwidth * pixelsize if maskimage else 0
         dy = dy * dstwidth * pixelsize
-        for x in range(x1 - x0):
-            dx = x0 + x
-            if wraparound:
-                dx %= dstwidth
-            if (not wraparound) and dx < 0 or dx >= dstwidth:
+        for r in range(len(runs)):
+            dx, sx, mx, _, size, ones = runs[r]
+            if rowcount > 1:
+                size *= rowcount
+                ones = (1 << (size * 8)) - 1
+            dstpos = dy + dx
+            if sourceCopy:
+                dstimage[dstpos : dstpos + size] = srcimage[sy + sx : sy + sx + size]
                 continue
-            dstpos = dy + dx * pixelsize
-            srcpos = sy + (x0src + x) * pixelsize
-            patpos = (
-                (paty + ((dx - patternOrgX) % patternwidth) * pixelsize)
-                if patternimage
-                else 0
-            )
-            maskpos = masky + (x0mask + x) * pixelsize if maskimage else 0
-            for i in range(pixelsize):
-                s1 = srcimage[srcpos + i] if srcimage else 0
-                d1 = dstimage[dstpos + i] if dstimage else 0
-                p1 = patternimage[patpos + i] if patternimage else 0
-                m1 = maskimage[maskpos + i] if maskimage else 0
-                sdl = _applyrop(d1, s1, ropForeground & 0xF)
-                sdh = _applyrop(d1, s1, (ropForeground >> 4) & 0xF)
-                sdp = (p1 & sdh) ^ ((~p1) & sdl)
-                if maskimage:
-                    sdl = _applyrop(d1, s1, ropBackground & 0xF)
-                    sdh = _applyrop(d1, s1, (ropBackground >> 4) & 0xF)
-                    sdpb = (p1 & sdh) ^ ((~p1) & sdl)
-                    sdp = (m1 & sdp) ^ ((~m1) & sdpb)
-                dstimage[dstpos + i] = sdp
+            d1 = 0
+            if needDestination:
+                d1 = int.from_bytes(dstimage[dstpos : dstpos + size], "big")
+            s1 = 0
+            if srcimage and needSource:
+                s1 = int.from_bytes(srcimage[sy + sx : sy + sx + size], "big")
+            p1 = patterns[r] if patternimage else 0
+            sdp = ropfg(d1, s1, p1, ones)
+            if maskimage:
+                m1 = int.from_bytes(maskimage[masky + mx : masky + mx + size], "big")
+                sdpb = ropbg(d1, s1, p1, ones)
+                sdp = (m1 & sdp) ^ ((~m1) & sdpb)
+            dstimage[dstpos : dstpos + size] = sdp.to_bytes(size, "big")
 
 # All images have the same format returned by the blankimage() method with the given value of 'alpha'.
 # The default value for 'alpha' is False, and the alpha channel (opacity channel) of the images, if any, is
@@ -1511,7 +1727,7 @@ def imagetransblit(
             (
                 srcimage
                 if srcimage is not dstimage
-                else ([x for x in srcimage] if srcimage else None)
+                else (srcimage[:] if srcimage else None)
             ),
             srcwidth,
             srcheight,
@@ -1521,7 +1737,7 @@ def imagetransblit(
             (
                 patternimage
                 if patternimage is not dstimage
-                else ([x for x in patternimage] if patternimage else None)
+                else (patternimage[:] if patternimage else None)
             ),
             patternwidth,
             patternheight,
@@ -1530,302 +1746,408 @@ def imagetransblit(
             ropForeground,
             ropBackground,
             wraparound,
+            alpha=alpha,
         )
+    if x0 == x1 or y0 == y1:
+        return
     pixelsize = 4 if alpha else 3
-    for y in range(y1 - y0):
-        dy = y0 + y
-        if wraparound:
-            dy %= dstheight
-        if (not wraparound) and dy < 0 or dy >= dstheight:
-            continue
+    # Bytes of the transparent color to compare with each source pixel
+    transbytes = bytes(transcolor[: 4 if alpha and len(transcolor) > 3 else 3])
+    ropfg = _TernaryRops[ropForeground]
+    ropbg = _TernaryRops[ropBackground]
+    # The transparent color and the bytes compared with it, padded
+    # to a whole pixel
+    transpixel = transbytes + bytes(pixelsize - len(transbytes))
+    comparedpixel = b"\xff" * len(transbytes) + bytes(pixelsize - len(transbytes))
+    # As in imageblitex(), each run of a row is handled at once.  The
+    # transparent pixels of a run are also found at once: each byte of
+    # x = (source ^ transparent color) & compared bytes is nonzero if and
+    # only if ((x & 0x7F) + 0x7F) | x has its high bit set (with no carry
+    # between bytes), and these bits are then gathered into the lowest bit
+    # of each pixel and spread over that pixel by a multiply.
+    # Everything about a run that doesn't depend on the row is found once.
+    runs = [
+        (
+            dx * pixelsize,
+            (x0src + x) * pixelsize,
+            ((dx + patternOrgX) % patternwidth) * pixelsize if patternimage else 0,
+            count * pixelsize,
+            (1 << (count * pixelsize * 8)) - 1,
+            int.from_bytes(transpixel * count, "big"),
+            int.from_bytes(comparedpixel * count, "big"),
+            int.from_bytes(b"\x7f" * (count * pixelsize), "big"),
+            int.from_bytes(b"\x80" * (count * pixelsize), "big"),
+            int.from_bytes((bytes(pixelsize - 1) + b"\x01") * count, "big"),
+        )
+        for dx, x, count in _wrapruns(x0, x1, dstwidth, wraparound)
+    ]
+    spread = (1 << (pixelsize * 8)) - 1
+    # The last shift that gathers a pixel's bytes (repeating the shift
+    # by 16 for three-byte pixels)
+    lastshift = 24 if pixelsize == 4 else 16
+    # Packed pattern bytes for each run, by pattern row
+    patterncache = {}
+    for dy, y in _wraprows(y0, y1, dstheight, wraparound):
         sy = (y0src + y) * srcwidth * pixelsize
-        paty = ((dy + patternOrgY) % patternheight) * pixelsize if patternimage else 0
+        if patternimage:
+            paty = ((dy + patternOrgY) % patternheight) * pixelsize
+            patterns = patterncache.get(paty)
+            if patterns is None:
+                # Repeat the pattern row, starting at each run's phase
+                patrow = patternimage[paty : paty + patternwidth * pixelsize]
+                patterns = []
+                for run in runs:
+                    patpos, size = run[2], run[3]
+                    tile = patrow * ((patpos + size + len(patrow) - 1) // len(patrow))
+                    patterns.append(int.from_bytes(tile[patpos : patpos + size], "big"))
+                patterncache[paty] = patterns
         dy = dy * dstwidth * pixelsize
-        for x in range(x1 - x0):
-            dx = x0 + x
-            if wraparound:
-                dx %= dstwidth
-            if (not wraparound) and dx < 0 or dx >= dstwidth:
-                continue
-            dstpos = dy + dx * pixelsize
-            srcpos = sy + (x0src + x) * pixelsize
-            patpos = (
-                paty + ((dx + patternOrgX) % patternwidth) * pixelsize
-                if patternimage
-                else 0
-            )
-            m1 = (
-                0x00
-                if (
-                    srcimage[srcpos] == transcolor[0]
-                    and srcimage[srcpos + 1] == transcolor[1]
-                    and srcimage[srcpos + 2] == transcolor[2]
-                    and (
-                        (not alpha)
-                        or len(transcolor) == 3
-                        or srcimage[srcpos + 3] == transcolor[3]
-                    )
-                )
-                else 0xFF
+        for r in range(len(runs)):
+            dx, sx, _, size, ones, trans, compared, low7, high, lowest = runs[r]
+            dstpos = dy + dx
+            s1 = int.from_bytes(bytes(srcimage[sy + sx : sy + sx + size]), "big")
+            # The mask is all ones except where the source is the
+            # transparent color
+            x = (s1 ^ trans) & compared
+            nonzero = ((((x & low7) + low7) | x) & high) >> 7
+            differs = (
+                nonzero | (nonzero >> 8) | (nonzero >> 16) | (nonzero >> lastshift)
             )
-            for i in range(pixelsize):
-                s1 = srcimage[srcpos + i] if srcimage else 0
-                d1 = dstimage[dstpos + i] if dstimage else 0
-                p1 = patternimage[patpos + i] if patternimage else 0
-                sdl = _applyrop(d1, s1, ropForeground & 0xF)
-                sdh = _applyrop(d1, s1, (ropForeground >> 4) & 0xF)
-                sdp = (p1 & sdh) ^ ((~p1) & sdl)
-                sdl = _applyrop(d1, s1, ropBackground & 0xF)
-                sdh = _applyrop(d1, s1, (ropBackground >> 4) & 0xF)
-                sdpb = (p1 & sdh) ^ ((~p1) & sdl)
-                sdp = (m1 & sdp) ^ ((~m1) & sdpb)
-                dstimage[dstpos + i] = sdp
+            m1 = (differs & lowest) * spread
+            d1 = int.from_bytes(dstimage[dstpos : dstpos + size], "big")
+            p1 = patterns[r] if patternimage else 0
+            sdp = ropfg(d1, s1, p1, ones)
+            sdpb = ropbg(d1, s1, p1, ones)
+            sdp = (m1 & sdp) ^ ((~m1) & sdpb)
+            dstimage[dstpos : dstpos + size] = sdp.to_bytes(size, "big")
+
+# Porter&ndash;Duff operators for _porterduff8bitalpha(), where 'sa' and 'da' are
+# the source and destination alpha components (from 0 through 255).
+# Blends of the form (a*s-d*(a-255))//255 are computed as d+a*(s-d)//255,
+# which is the same but with one multiply; a single floor division is
+# faster in Python than multiply-and-shift replacements for it.
+
+# Source over
+def _porterduff8srcover(d, di, s, si, sa, da, alpha):
+    den = da * (sa - 255) - 255 * sa
+    if den == 0:
+        d[di] = d[di + 1] = d[di + 2] = 0
+        if alpha:
+            d[di + 3] = 0
+    else:
+        d[di] = (da * d[di] * (sa - 255) - 255 * sa * s[si]) // den
+        d[di + 1] = (da * d[di + 1] * (sa - 255) - 255 * sa * s[si + 1]) // den
+        d[di + 2] = (da * d[di + 2] * (sa - 255) - 255 * sa * s[si + 2]) // den
+        if alpha:
+            d[di + 3] = da + sa - da * sa // 255
+
+# Source in
+def _porterduff8srcin(d, di, s, si, sa, da, alpha):
+    d[di] = s[si]
+    d[di + 1] = s[si + 1]
+    d[di + 2] = s[si + 2]
+    if alpha:
+        d[di + 3] = (da * sa) // 255
+
+# Source held out
+def _porterduff8srcout(d, di, s, si, sa, da, alpha):
+    d[di] = s[si]
+    d[di + 1] = s[si + 1]
+    d[di + 2] = s[si + 2]
+    if alpha:
+        d[di + 3] = ((255 - da) * sa) // 255
+
+# Source atop
+def _porterduff8srcatop(d, di, s, si, sa, da, alpha):
+    d[di] += sa * (s[si] - d[di]) // 255
+    d[di + 1] += sa * (s[si + 1] - d[di + 1]) // 255
+    d[di + 2] += sa * (s[si + 2] - d[di + 2]) // 255
+    if alpha:
+        d[di + 3] = da
+
+# Destination over
+def _porterduff8dstover(d, di, s, si, sa, da, alpha):
+    den = sa * (da - 255) - 255 * da
+    if den == 0:
+        d[di] = d[di + 1] = d[di + 2] = 0
+        if alpha:
+            d[di + 3] = 0
+    else:
+        d[di] = (sa * s[si] * (da - 255) - 255 * da * d[di]) // den
+        d[di + 1] = (sa * s[si + 1] * (da - 255) - 255 * da * d[di + 1]) // den
+        d[di + 2] = (sa * s[si + 2] * (da - 255) - 255 * da * d[di + 2]) // den
+        if alpha:
+            d[di + 3] = sa + da - sa * da // 255
+
+# Destination in
+def _porterduff8dstin(d, di, s, si, sa, da, alpha):
+    # Destination RGB left unchanged
+    if alpha:
+        d[di + 3] = (sa * da) // 255
+
+# Destination held out
+def _porterduff8dstout(d, di, s, si, sa, da, alpha):
+    # Destination RGB left unchanged
+    if alpha:
+        d[di + 3] = ((255 - sa) * da) // 255
+
+# Destination atop
+def _porterduff8dstatop(d, di, s, si, sa, da, alpha):
+    d[di] = s[si] + da * (d[di] - s[si]) // 255
+    d[di + 1] = s[si + 1] + da * (d[di + 1] - s[si + 1]) // 255
+    d[di + 2] = s[si + 2] + da * (d[di + 2] - s[si + 2]) // 255
+    if alpha:
+        d[di + 3] = sa
+
+# Source
+def _porterduff8src(d, di, s, si, sa, da, alpha):
+    d[di] = s[si]
+    d[di + 1] = s[si + 1]
+    d[di + 2] = s[si + 2]
+    if alpha:
+        d[di + 3] = sa
+
+# Destination
+def _porterduff8dst(d, di, s, si, sa, da, alpha):
+    pass
+
+# Clear
+def _porterduff8clear(d, di, s, si, sa, da, alpha):
+    d[di] = 0
+    d[di + 1] = 0
+    d[di + 2] = 0
+    if alpha:
+        d[di + 3] = 0
+
+# XOR
+def _porterduff8xor(d, di, s, si, sa, da, alpha):
+    den = -2 * da * sa + 255 * (da + sa)
+    if den == 0:
+        d[di] = d[di + 1] = d[di + 2] = 0
+        if alpha:
+            d[di + 3] = 0
+    else:
+        d[di] = (
+            -da * d[di] * sa
+            + 255 * da * d[di]
+            - da * sa * s[si]
+            + 255 * sa * s[si]
+        ) // den
+        d[di + 1] = (
+            -da * d[di + 1] * sa
+            + 255 * da * d[di + 1]
+            - da * sa * s[si + 1]
+            + 255 * sa * s[si + 1]
+        ) // den
+        d[di + 2] = (
+            -da * d[di + 2] * sa
+            + 255 * da * d[di + 2]
+            - da * sa * s[si + 2]
+            + 255 * sa * s[si + 2]
+        ) // den
+        if alpha:
+            d[di + 3] = -2 * da * sa // 255 + da + sa
+
+# Plus
+def _porterduff8plus(d, di, s, si, sa, da, alpha):
+    den = da + sa
+    if den == 0:
+        d[di] = d[di + 1] = d[di + 2] = 0
+        if alpha:
+            d[di + 3] = 0
+    else:
+        d[di] = min(255, (da * d[di] + sa * s[si]) // den)
+        d[di + 1] = min(255, (da * d[di + 1] + sa * s[si + 1]) // den)
+        d[di + 2] = min(255, (da * d[di + 2] + sa * s[si + 2]) // den)
+        if alpha:
+            d[di + 3] = min(255, den)
+
+_PorterDuff8BitOps = [
+    _porterduff8srcover,
+    _porterduff8srcin,
+    _porterduff8srcout,
+    _porterduff8srcatop,
+    _porterduff8dstover,
+    _porterduff8dstin,
+    _porterduff8dstout,
+    _porterduff8dstatop,
+    _porterduff8src,
+    _porterduff8dst,
+    _porterduff8clear,
+    _porterduff8xor,
+    _porterduff8plus,
+]
 
 def _porterduff8bitalpha(d, di, s, si, op, sa255, alpha=True):
-    sa = sa255
     da = d[di + 3] if alpha else 255
-    match op:
-        case 0:  # source over
-            den = da * (sa - 255) - 255 * sa
-            if den == 0:
-                d[di] = d[di + 1] = d[di + 2] = 0
-                if alpha:
-                    d[di + 3] = 0
-            else:
-                d[di] = (da * d[di] * (sa - 255) - 255 * sa * s[si]) // den
-                d[di + 1] = (da * d[di + 1] * (sa - 255) - 255 * sa * s[si + 1]) // den
-                d[di + 2] = (da * d[di + 2] * (sa - 255) - 255 * sa * s[si + 2]) // den
-                if alpha:
-                    d[di + 3] = da + sa - da * sa // 255
-        case 1:  # source in
-            d[di] = s[si]
-            d[di + 1] = s[si + 1]
-            d[di + 2] = s[si + 2]
-            if alpha:
-                d[di + 3] = (da * sa) // 255
-        case 2:  # source held out
-            d[di] = s[si]
-            d[di + 1] = s[si + 1]
-            d[di + 2] = s[si + 2]
-            if alpha:
-                d[di + 3] = ((255 - da) * sa) // 255
-        case 3:  # source atop
-            d[di] = (sa * s[si] - d[di] * (sa - 255)) // 255
-            d[di + 1] = (sa * s[si + 1] - d[di + 1] * (sa - 255)) // 255
-            d[di + 2] = (sa * s[si + 2] - d[di + 2] * (sa - 255)) // 255
-            if alpha:
-                d[di + 3] = da
-        case 4:  # destination over
-            den = sa * (da - 255) - 255 * da
-            if den == 0:
-                d[di] = d[di + 1] = d[di + 2] = 0
-                if alpha:
-                    d[di + 3] = 0
-            else:
-                d[di] = (sa * s[si] * (da - 255) - 255 * da * d[di]) // den
-                d[di + 1] = (sa * s[si + 1] * (da - 255) - 255 * da * d[di + 1]) // den
-                d[di + 2] = (sa * s[si + 2] * (da - 255) - 255 * da * d[di + 2]) // den
-                if alpha:
-                    d[di + 3] = sa + da - sa * da // 255
-        case 5:  # destination in
-            # Destination RGB left unchanged
-            if alpha:
-                d[di + 3] = (sa * da) // 255
-        case 6:  # destination held out
-            # Destination RGB left unchanged
-            if alpha:
-                d[di + 3] = ((255 - sa) * da) // 255
-        case 7:  # destination atop
-            d[di] = (da * d[di] - s[si] * (da - 255)) // 255
-            d[di + 1] = (da * d[di + 1] - s[si + 1] * (da - 255)) // 255
-            d[di + 2] = (da * d[di + 2] - s[si + 2] * (da - 255)) // 255
-            if alpha:
-                d[di + 3] = sa
-        case 8:  # source
-            d[di] = s[si]
-            d[di + 1] = s[si + 1]
-            d[di + 2] = s[si + 2]
-            if alpha:
-                d[di + 3] = sa
-        case 9:  # destination
-            pass
-        case 10:  # clear
-            d[di] = 0
-            d[di + 1] = 0
-            d[di + 2] = 0
-            if alpha:
-                d[di + 3] = 0
-        case 11:  # XOR
-            den = -2 * da * sa + 255 * (da + sa)
-            if den == 0:
-                d[di] = d[di + 1] = d[di + 2] = 0
-                if alpha:
-                    d[di + 3] = 0
-            else:
-                d[di] = (
-                    -da * d[di] * sa
-                    + 255 * da * d[di]
-                    - da * sa * s[si]
-                    + 255 * sa * s[si]
-                ) // den
-                d[di + 1] = (
-                    -da * d[di + 1] * sa
-                    + 255 * da * d[di + 1]
-                    - da * sa * s[si + 1]
-                    + 255 * sa * s[si + 1]
-                ) // den
-                d[di + 2] = (
-                    -da * d[di + 2] * sa
-                    + 255 * da * d[di + 2]
-                    - da * sa * s[si + 2]
-                    + 255 * sa * s[si + 2]
-                ) // den
-                if alpha:
-                    d[di + 3] = -2 * da * sa // 255 + da + sa
-        case 12:  # plus
-            den = da + sa
-            if den == 0:
-                d[di] = d[di + 1] = d[di + 2] = 0
-                if alpha:
-                    d[di + 3] = 0
-            else:
-                d[di] = min(255, (da * d[di] + sa * s[si]) // den)
-                d[di + 1] = min(255, (da * d[di + 1] + sa * s[si + 1]) // den)
-                d[di + 2] = min(255, (da * d[di + 2] + sa * s[si + 2]) // den)
-                if alpha:
-                    d[di + 3] = min(255, den)
-        case _:
-            raise ValueError
+    if op < 0 or op >= len(_PorterDuff8BitOps):
+        raise ValueError
+    _PorterDuff8BitOps[op](d, di, s, si, sa255, da, alpha)
+
+# Porter&ndash;Duff operators for _porterduff16bitalpha(), where 'sa' is the
+# source alpha component times 255 (from 0 through 65025) and 'da' is the
+# destination alpha component (from 0 through 255)
+
+# Source over
+def _porterduff16srcover(d, di, s, si, sa, da, alpha):
+    den = da * (sa - 65025) - 255 * sa
+    if den == 0:
+        d[di] = d[di + 1] = d[di + 2] = 0
+        if alpha:
+            d[di + 3] = 0
+    else:
+        d[di] = (da * d[di] * (sa - 65025) - 255 * sa * s[si]) // den
+        d[di + 1] = (da * d[di + 1] * (sa - 65025) - 255 * sa * s[si + 1]) // den
+        d[di + 2] = (da * d[di + 2] * (sa - 65025) - 255 * sa * s[si + 2]) // den
+        if alpha:
+            d[di + 3] = (da * 65025 + sa * 255 - da * sa) // 65025
+
+# Source in
+def _porterduff16srcin(d, di, s, si, sa, da, alpha):
+    d[di] = s[si]
+    d[di + 1] = s[si + 1]
+    d[di + 2] = s[si + 2]
+    if alpha:
+        d[di + 3] = (da * sa) // 65025
+
+# Source held out
+def _porterduff16srcout(d, di, s, si, sa, da, alpha):
+    d[di] = s[si]
+    d[di + 1] = s[si + 1]
+    d[di + 2] = s[si + 2]
+    if alpha:
+        d[di + 3] = ((255 - da) * sa) // 65025
+
+# Source atop
+def _porterduff16srcatop(d, di, s, si, sa, da, alpha):
+    d[di] += sa * (s[si] - d[di]) // 65025
+    d[di + 1] += sa * (s[si + 1] - d[di + 1]) // 65025
+    d[di + 2] += sa * (s[si + 2] - d[di + 2]) // 65025
+    if alpha:
+        d[di + 3] = da
+
+# Destination over
+def _porterduff16dstover(d, di, s, si, sa, da, alpha):
+    den = sa * (da - 255) - 65025 * da
+    if den == 0:
+        d[di] = d[di + 1] = d[di + 2] = 0
+        if alpha:
+            d[di + 3] = 0
+    else:
+        d[di] = (sa * s[si] * (da - 255) - 65025 * da * d[di]) // den
+        d[di + 1] = (sa * s[si + 1] * (da - 255) - 65025 * da * d[di + 1]) // den
+        d[di + 2] = (sa * s[si + 2] * (da - 255) - 65025 * da * d[di + 2]) // den
+        if alpha:
+            d[di + 3] = (sa * 255 + da * 65025 - sa * da) // 65025
+
+# Destination in
+def _porterduff16dstin(d, di, s, si, sa, da, alpha):
+    # Destination RGB left unchanged
+    if alpha:
+        d[di + 3] = (sa * da) // 65025
+
+# Destination held out
+def _porterduff16dstout(d, di, s, si, sa, da, alpha):
+    # Destination RGB left unchanged
+    if alpha:
+        d[di + 3] = ((65025 - sa) * da) // 65025
+
+# Destination atop
+def _porterduff16dstatop(d, di, s, si, sa, da, alpha):
+    d[di] = s[si] + da * (d[di] - s[si]) // 255
+    d[di + 1] = s[si + 1] + da * (d[di + 1] - s[si + 1]) // 255
+    d[di + 2] = s[si + 2] + da * (d[di + 2] - s[si + 2]) // 255
+    if alpha:
+        d[di + 3] = sa // 255
+
+# Source
+def _porterduff16src(d, di, s, si, sa, da, alpha):
+    d[di] = s[si]
+    d[di + 1] = s[si + 1]
+    d[di + 2] = s[si + 2]
+    if alpha:
+        d[di + 3] = sa // 255
+
+# Destination
+def _porterduff16dst(d, di, s, si, sa, da, alpha):
+    pass
+
+# Clear
+def _porterduff16clear(d, di, s, si, sa, da, alpha):
+    d[di] = 0
+    d[di + 1] = 0
+    d[di + 2] = 0
+    if alpha:
+        d[di + 3] = 0
+
+# XOR
+def _porterduff16xor(d, di, s, si, sa, da, alpha):
+    den = -2 * da * sa + 65025 * da + 255 * sa
+    if den == 0:
+        d[di] = d[di + 1] = d[di + 2] = 0
+        if alpha:
+            d[di + 3] = 0
+    else:
+        d[di] = (
+            -da * d[di] * sa
+            + 65025 * da * d[di]
+            - da * sa * s[si]
+            + 255 * sa * s[si]
+        ) // den
+        d[di + 1] = (
+            -da * d[di + 1] * sa
+            + 65025 * da * d[di + 1]
+            - da * sa * s[si + 1]
+            + 255 * sa * s[si + 1]
+        ) // den
+        d[di + 2] = (
+            -da * d[di + 2] * sa
+            + 65025 * da * d[di + 2]
+            - da * sa * s[si + 2]
+            + 255 * sa * s[si + 2]
+        ) // den
+        if alpha:
+            d[di + 3] = (-2 * da * sa + sa * 255) // 255 + da
+
+# Plus
+def _porterduff16plus(d, di, s, si, sa, da, alpha):
+    den = 255 * da + sa
+    if den == 0:
+        d[di] = d[di + 1] = d[di + 2] = 0
+        if alpha:
+            d[di + 3] = 0
+    else:
+        d[di] = min(255, (255 * da * d[di] + sa * s[si]) // den)
+        d[di + 1] = min(255, (255 * da * d[di + 1] + sa * s[si + 1]) // den)
+        d[di + 2] = min(255, (255 * da * d[di + 2] + sa * s[si + 2]) // den)
+        if alpha:
+            d[di + 3] = min(255, den // 255)
+
+_PorterDuff16BitOps = [
+    _porterduff16srcover,
+    _porterduff16srcin,
+    _porterduff16srcout,
+    _porterduff16srcatop,
+    _porterduff16dstover,
+    _porterduff16dstin,
+    _porterduff16dstout,
+    _porterduff16dstatop,
+    _porterduff16src,
+    _porterduff16dst,
+    _porterduff16clear,
+    _porterduff16xor,
+    _porterduff16plus,
+]
 
 def _porterduff16bitalpha(d, di, s, si, op, sa65025, alpha=True):
     sa = sa65025
     da = d[di + 3] if alpha else 255
-    if sa == 65025:
-        _porterduff8bitalpha(d, di, s, si, op, 255, alpha=alpha)
+    if sa == 65025 or sa == 0:
+        _porterduff8bitalpha(d, di, s, si, op, sa // 255, alpha=alpha)
         return
-    elif sa == 0:
-        _porterduff8bitalpha(d, di, s, si, op, 0, alpha=alpha)
-        return
-    match op:
-        case 0:  # source over
-            den = da * (sa - 65025) - 255 * sa
-            if den == 0:
-                d[di] = d[di + 1] = d[di + 2] = 0
-                if alpha:
-                    d[di + 3] = 0
-            else:
-                d[di] = (da * d[di] * (sa - 65025) - 255 * sa * s[si]) // den
-                d[di + 1] = (
-                    da * d[di + 1] * (sa - 65025) - 255 * sa * s[si + 1]
-                ) // den
-                d[di + 2] = (
-                    da * d[di + 2] * (sa - 65025) - 255 * sa * s[si + 2]
-                ) // den
-                if alpha:
-                    d[di + 3] = (da * 65025 + sa * 255 - da * sa) // 65025
-        case 1:  # source in
-            d[di] = s[si]
-            d[di + 1] = s[si + 1]
-            d[di + 2] = s[si + 2]
-            if alpha:
-                d[di + 3] = (da * sa) // 65025
-        case 2:  # source held out
-            d[di] = s[si]
-            d[di + 1] = s[si + 1]
-            d[di + 2] = s[si + 2]
-            if alpha:
-                d[di + 3] = ((255 - da) * sa) // 65025
-        case 3:  # source atop
-            d[di] = (sa * s[si] - d[di] * (sa - 65025)) // 65025
-            d[di + 1] = (sa * s[si + 1] - d[di + 1] * (sa - 65025)) // 65025
-            d[di + 2] = (sa * s[si + 2] - d[di + 2] * (sa - 65025)) // 65025
-            if alpha:
-                d[di + 3] = da
-        case 4:  # destination over
-            den = sa * (da - 255) - 65025 * da
-            if den == 0:
-                d[di] = d[di + 1] = d[di + 2] = 0
-                if alpha:
-                    d[di + 3] = 0
-            else:
-                d[di] = (sa * s[si] * (da - 255) - 65025 * da * d[di]) // den
-                d[di + 1] = (
-                    sa * s[si + 1] * (da - 255) - 65025 * da * d[di + 1]
-                ) // den
-                d[di + 2] = (
-                    sa * s[si + 2] * (da - 255) - 65025 * da * d[di + 2]
-                ) // den
-                if alpha:
-                    d[di + 3] = (sa * 255 + da * 65025 - sa * da) // 65025
-        case 5:  # destination in
-            # Destination RGB left unchanged
-            if alpha:
-                d[di + 3] = (sa * da) // 65025
-        case 6:  # destination held out
-            # Destination RGB left unchanged
-            if alpha:
-                d[di + 3] = ((65025 - sa) * da) // 65025
-        case 7:  # destination atop
-            d[di] = (da * d[di] - s[si] * (da - 255)) // 255
-            d[di + 1] = (da * d[di + 1] - s[si + 1] * (da - 255)) // 255
-            d[di + 2] = (da * d[di + 2] - s[si + 2] * (da - 255)) // 255
-            if alpha:
-                d[di + 3] = sa // 255
-        case 8:  # source
-            d[di] = s[si]
-            d[di + 1] = s[si + 1]
-            d[di + 2] = s[si + 2]
-            if alpha:
-                d[di + 3] = sa // 255
-        case 9:  # destination
-            pass
-        case 10:  # clear
-            d[di] = 0
-            d[di + 1] = 0
-            d[di + 2] = 0
-            if alpha:
-                d[di + 3] = 0
-        case 11:  # XOR
-            den = -2 * da * sa + 65025 * da + 255 * sa
-            if den == 0:
-                d[di] = d[di + 1] = d[di + 2] = 0
-                if alpha:
-                    d[di + 3] = 0
-            else:
-                d[di] = (
-                    -da * d[di] * sa
-                    + 65025 * da * d[di]
-                    - da * sa * s[si]
-                    + 255 * sa * s[si]
-                ) // den
-                d[di + 1] = (
-                    -da * d[di + 1] * sa
-                    + 65025 * da * d[di + 1]
-                    - da * sa * s[si + 1]
-                    + 255 * sa * s[si + 1]
-                ) // den
-                d[di + 2] = (
-                    -da * d[di + 2] * sa
-                    + 65025 * da * d[di + 2]
-                    - da * sa * s[si + 2]
-                    + 255 * sa * s[si + 2]
-                ) // den
-                if alpha:
-                    d[di + 3] = (-2 * da * sa + sa * 255) // 255 + da
-        case 12:  # plus
-            den = 255 * da + sa
-            if den == 0:
-                d[di] = d[di + 1] = d[di + 2] = 0
-                if alpha:
-                    d[di + 3] = 0
-            else:
-                d[di] = min(255, (255 * da * d[di] + sa * s[si]) // den)
-                d[di + 1] = min(255, (255 * da * d[di + 1] + sa * s[si + 1]) // den)
-                d[di + 2] = min(255, (255 * da * d[di + 2] + sa * s[si + 2]) // den)
-                if alpha:
-                    d[di + 3] = min(255, den // 255)
-        case _:
-            raise ValueError
+    if op < 0 or op >= len(_PorterDuff16BitOps):
+        raise ValueError
+    _PorterDuff16BitOps[op](d, di, s, si, sa, da, alpha)
 
 # Performs a source-over composition involving a source image with an alpha channel
 # and a destination image without an alpha channel.  The destination rectangle
@@ -1900,7 +2222,7 @@ def imagesrcover(
             (
                 srcimage
                 if srcimage is not dstimage
-                else ([x for x in srcimage] if srcimage else None)
+                else (srcimage[:] if srcimage else None)
             ),
             srcwidth,
             srcheight,
@@ -1910,52 +2232,78 @@ def imagesrcover(
             sourceAlpha=sourceAlpha,
             screendoor=screendoor,
         )
-    for y in range(y1 - y0):
-        dy = y0 + y
-        if wraparound:
-            dy %= dstheight
-        if (not wraparound) and dy < 0 or dy >= dstheight:
-            continue
+    if screendoor:
+        # For each source alpha, the dither threshold below which the
+        # source pixel is drawn
+        levels = [sa * sourceAlpha * 64 // 65025 for sa in range(256)]
+    # The runs of each row that are contiguous in the destination
+    # are the same for every row, so find them once
+    runs = _wrapruns(x0, x1, dstwidth, wraparound)
+    # Blending tables for runs whose source alphas are all the same,
+    # keyed by that alpha
+    blendtables = {}
+    for dy, y in _wraprows(y0, y1, dstheight, wraparound):
         sy = (y0src + y) * srcwidth * 4
         dypos = dy
         dy = dy * dstwidth * 3
-        for x in range(x1 - x0):
-            dx = x0 + x
-            if wraparound:
-                dx %= dstwidth
-            if (not wraparound) and dx < 0 or dx >= dstwidth:
-                continue
+        for dx, x, count in runs:
             dstpos = dy + dx * 3
             srcpos = sy + (x0src + x) * 4
-            sa = srcimage[srcpos + 3]
-            if sourceAlpha == 255 and not screendoor:
-                dstimage[dstpos] = (
-                    sa * srcimage[srcpos] - dstimage[dstpos] * (sa - 255)
-                ) // 255
-                dstimage[dstpos + 1] = (
-                    sa * srcimage[srcpos + 1] - dstimage[dstpos + 1] * (sa - 255)
-                ) // 255
-                dstimage[dstpos + 2] = (
-                    sa * srcimage[srcpos + 2] - dstimage[dstpos + 2] * (sa - 255)
-                ) // 255
+            srcrun = srcimage[srcpos : srcpos + count * 4]
+            if screendoor:
+                ditherrow = (dypos & 7) * 8
+                for i in range(count):
+                    bdither = _DitherMatrix[ditherrow + ((dx + i) & 7)]
+                    if bdither < levels[srcrun[i * 4 + 3]]:
+                        dstimage[dstpos + i * 3 : dstpos + i * 3 + 3] = srcrun[
+                            i * 4 : i * 4 + 3
+                        ]
+                continue
+            alphas = srcrun[3::4]
+            maxalpha = max(alphas)
+            if maxalpha == 0:
+                # Fully transparent run; nothing to draw
+                continue
+            minalpha = min(alphas)
+            dstrun = dstimage[dstpos : dstpos + count * 3]
+            if sourceAlpha == 255 and minalpha == 255:
+                # Fully opaque run; the source's colors are copied
+                for c in range(3):
+                    dstrun[c::3] = srcrun[c::4]
+                dstimage[dstpos : dstpos + count * 3] = dstrun
+                continue
+            if minalpha == maxalpha:
+                # Every pixel in the run has the same alpha, so each blended
+                # component is the destination's plus a function of the
+                # source's difference from it, which is looked up in a table
+                # (a negative difference indexes from the table's end)
+                table = blendtables.get(minalpha)
+                if not table:
+                    sa = minalpha * sourceAlpha
+                    table = [sa * d // 65025 for d in range(256)] + [
+                        sa * d // 65025 for d in range(-255, 0)
+                    ]
+                    blendtables[minalpha] = table
+                for c in range(3):
+                    dstrun[c::3] = [
+                        dc + table[sc - dc]
+                        for sc, dc in zip(srcrun[c::4], dstrun[c::3])
+                    ]
+                dstimage[dstpos : dstpos + count * 3] = dstrun
+                continue
+            # Blend the run a color channel at a time; note that
+            # (sa*sc-dc*(sa-full))//full equals dc+sa*(sc-dc)//full
+            if sourceAlpha == 255:
+                full = 255
             else:
-                sa *= sourceAlpha
-                if screendoor:
-                    bdither = _DitherMatrix[(dypos & 7) * 8 + (dx & 7)]
-                    if bdither < sa * 64 // 65025:
-                        dstimage[dstpos] = srcimage[srcpos]
-                        dstimage[dstpos + 1] = srcimage[srcpos + 1]
-                        dstimage[dstpos + 2] = srcimage[srcpos + 2]
-                else:
-                    dstimage[dstpos] = (
-                        sa * srcimage[srcpos] - dstimage[dstpos] * (sa - 65025)
-                    ) // 65025
-                    dstimage[dstpos + 1] = (
-                        sa * srcimage[srcpos + 1] - dstimage[dstpos + 1] * (sa - 65025)
-                    ) // 65025
-                    dstimage[dstpos + 2] = (
-                        sa * srcimage[srcpos + 2] - dstimage[dstpos + 2] * (sa - 65025)
-                    ) // 65025
+                alphas = [sa * sourceAlpha for sa in alphas]
+                full = 65025
+            for c in range(3):
+                dstrun[c::3] = [
+                    dc + sa * (sc - dc) // full
+                    for sa, sc, dc in zip(alphas, srcrun[c::4], dstrun[c::3])
+                ]
+            dstimage[dstpos : dstpos + count * 3] = dstrun
 
 # Performs an image composition involving a source image and a destination image.  The destination rectangle
 # begins at x0 and y0 and has width ('x1'-'x0') and height ('y1'-'y0'), and
@@ -2048,7 +2396,7 @@ def imagecomposite(
             (
                 srcimage
                 if srcimage is not dstimage
-                else ([x for x in srcimage] if srcimage else None)
+                else (srcimage[:] if srcimage else None)
             ),
             srcwidth,
             srcheight,
@@ -2062,47 +2410,168 @@ def imagecomposite(
         )
     pixelsize = 4 if alpha else 3
     fakesrc = [0, 0, 0, 0]
-    for y in range(y1 - y0):
-        dy = y0 + y
-        if wraparound:
-            dy %= dstheight
-        if (not wraparound) and dy < 0 or dy >= dstheight:
-            continue
+    # The operator is the same for every pixel, so look it up once; its
+    # 8-bit form is used for a fully transparent or opaque source pixel
+    op8 = _PorterDuff8BitOps[porterDuffOp]
+    op16 = _PorterDuff16BitOps[porterDuffOp]
+    # Source over and source atop, the most common arithmetic operators,
+    # are done on each run a color channel at a time (without alpha
+    # channels the two operators give the same result), as are the
+    # operators whose colors, if changed, are just the source's
+    bychannel = srcimage and (not screendoor) and porterDuffOp in (0, 1, 2, 3, 5, 6, 8)
+    sourceover = porterDuffOp == 0 and alpha
+    atop = porterDuffOp == 0 or porterDuffOp == 3
+    # The runs of each row that are contiguous in the destination
+    # are the same for every row, so find them once
+    runs = _wrapruns(x0, x1, dstwidth, wraparound)
+    # Without alpha channels, source in, source held out, and copy source
+    # just copy the source's colors, as does copy source with alpha
+    # channels if 'sourceAlpha' is 255; clear just zeros the destination
+    copysource = (
+        srcimage
+        and (not screendoor)
+        and (
+            (porterDuffOp == 8 and (sourceAlpha == 255 or not alpha))
+            or ((not alpha) and (porterDuffOp == 1 or porterDuffOp == 2))
+        )
+    )
+    clear = porterDuffOp == 10 and not screendoor
+    if copysource or clear:
+        # If a row's only run spans whole rows of both images, rows that
+        # are consecutive in the destination are copied together
+        rowsize = dstwidth * pixelsize
+        if len(runs) == 1 and runs[0][2] == dstwidth and (
+            clear or srcwidth == dstwidth
+        ):
+            rows = _wrapruns(y0, y1, dstheight, wraparound)
+            runs = [[0, 0, dstwidth]]
+        else:
+            rows = [(dy, y, 1) for dy, y in _wraprows(y0, y1, dstheight, wraparound)]
+        for dy, y, rowcount in rows:
+            sy = (y0src + y) * srcwidth * pixelsize
+            for dx, x, count in runs:
+                dstrun = dy * rowsize + dx * pixelsize
+                srcrun = sy + (x0src + x) * pixelsize
+                size = count * pixelsize * rowcount
+                if clear:
+                    dstimage[dstrun : dstrun + size] = [0] * size
+                else:
+                    dstimage[dstrun : dstrun + size] = srcimage[srcrun : srcrun + size]
+        return
+    if screendoor:
+        # For each source alpha, the dither threshold below which the
+        # source pixel is drawn
+        levels = [sa * sourceAlpha * 64 // 65025 for sa in range(256)]
+    # If every source pixel has the same combined alpha of 0 or 255, the
+    # 8-bit form of the operator is used without checking each pixel;
+    # otherwise each run's source alphas are checked once
+    constalpha = None
+    if sourceAlpha == 0 or ((not alpha) and sourceAlpha == 255):
+        constalpha = sourceAlpha
+    for dy, y in _wraprows(y0, y1, dstheight, wraparound):
         sy = (y0src + y) * srcwidth * pixelsize
+        ditherrow = (dy & 7) * 8
         dy = dy * dstwidth * pixelsize
-        for x in range(x1 - x0):
-            dx = x0 + x
-            if wraparound:
-                dx %= dstwidth
-            if (not wraparound) and dx < 0 or dx >= dstwidth:
-                continue
-            dstpos = dy + dx * pixelsize
-            srcpos = sy + (x0src + x) * pixelsize
+        for dx, x, count in runs:
+            dstrun = dy + dx * pixelsize
+            srcrun = sy + (x0src + x) * pixelsize
+            size = count * pixelsize
             if not srcimage:
-                _porterduff(dstimage, dstpos, fakesrc, 0, porterDuffOp, alpha=alpha)
-            else:
-                srca = srcimage[srcpos + 3] if alpha else 255
-                srca *= sourceAlpha
-                if screendoor:
-                    bdither = _DitherMatrix[(dypos & 7) * 8 + (dx & 7)]
-                    if not (bdither < srca * 64 // 65025):
+                # Source is transparent black
+                for i in range(count):
+                    dstpos = dstrun + i * pixelsize
+                    da = dstimage[dstpos + 3] if alpha else 255
+                    op8(dstimage, dstpos, fakesrc, 0, 0, da, alpha)
+                continue
+            if bychannel:
+                drun = dstimage[dstrun : dstrun + size]
+                srun = srcimage[srcrun : srcrun + size]
+                if alpha:
+                    sas = [sa * sourceAlpha for sa in srun[3::4]]
+                else:
+                    sas = [255 * sourceAlpha] * count
+                if sourceover:
+                    das = drun[3::4]
+                    dens = [da * (sa - 65025) - 255 * sa for sa, da in zip(sas, das)]
+                    for c in range(3):
+                        drun[c::4] = [
+                            (da * dc * (sa - 65025) - 255 * sa * sc) // den if den else 0
+                            for sa, da, den, sc, dc in zip(
+                                sas, das, dens, srun[c::4], drun[c::4]
+                            )
+                        ]
+                    drun[3::4] = [
+                        (da * 65025 + sa * 255 - da * sa) // 65025 if den else 0
+                        for sa, da, den in zip(sas, das, dens)
+                    ]
+                elif atop:
+                    # Source atop; (sa*sc-dc*(sa-65025))//65025 equals
+                    # dc+sa*(sc-dc)//65025
+                    for c in range(3):
+                        drun[c::pixelsize] = [
+                            dc + sa * (sc - dc) // 65025
+                            for sa, sc, dc in zip(
+                                sas, srun[c::pixelsize], drun[c::pixelsize]
+                            )
+                        ]
+                else:
+                    # Only reached with alpha channels
+                    das = drun[3::4]
+                    if porterDuffOp in (1, 2, 8):
+                        for c in range(3):
+                            drun[c::4] = srun[c::4]
+                    if porterDuffOp == 1:  # source in
+                        drun[3::4] = [(da * sa) // 65025 for sa, da in zip(sas, das)]
+                    elif porterDuffOp == 2:  # source held out
+                        drun[3::4] = [
+                            ((255 - da) * sa) // 65025 for sa, da in zip(sas, das)
+                        ]
+                    elif porterDuffOp == 5:  # destination in
+                        drun[3::4] = [(sa * da) // 65025 for sa, da in zip(sas, das)]
+                    elif porterDuffOp == 6:  # destination held out
+                        drun[3::4] = [
+                            ((65025 - sa) * da) // 65025 for sa, da in zip(sas, das)
+                        ]
+                    else:  # source
+                        drun[3::4] = [sa // 255 for sa in sas]
+                dstimage[dstrun : dstrun + size] = drun
+                continue
+            if screendoor:
+                # Source pixels are either skipped or drawn opaque
+                for i in range(count):
+                    srcpos = srcrun + i * pixelsize
+                    srca = srcimage[srcpos + 3] if alpha else 255
+                    bdither = _DitherMatrix[ditherrow + ((dx + i) & 7)]
+                    if not (bdither < levels[srca]):
                         continue
-                    srca = 65025
-                _porterduff16bitalpha(
-                    dstimage,
-                    dstpos,
-                    srcimage,
-                    srcpos,
-                    porterDuffOp,
-                    sa65025=srca,
-                    alpha=alpha,
-                )
-
-# Bilinear interpolation
-def _bilerp(y0x0, y0x1, y1x0, y1x1, tx, ty):
-    y0 = y0x0 + (y0x1 - y0x0) * tx
-    y1 = y1x0 + (y1x1 - y1x0) * tx
-    return y0 + (y1 - y0) * ty
+                    dstpos = dstrun + i * pixelsize
+                    da = dstimage[dstpos + 3] if alpha else 255
+                    op8(dstimage, dstpos, srcimage, srcpos, 255, da, alpha)
+                continue
+            runalpha = constalpha
+            if runalpha is None and alpha:
+                alphas = srcimage[srcrun + 3 : srcrun + size : 4]
+                if sourceAlpha == 255 and alphas.count(255) == count:
+                    runalpha = 255
+                elif alphas.count(0) == count:
+                    runalpha = 0
+            if runalpha is not None:
+                # Every pixel in the run is fully transparent or opaque
+                for i in range(count):
+                    srcpos = srcrun + i * pixelsize
+                    dstpos = dstrun + i * pixelsize
+                    da = dstimage[dstpos + 3] if alpha else 255
+                    op8(dstimage, dstpos, srcimage, srcpos, runalpha, da, alpha)
+                continue
+            for i in range(count):
+                srcpos = srcrun + i * pixelsize
+                srca = (srcimage[srcpos + 3] if alpha else 255) * sourceAlpha
+                dstpos = dstrun + i * pixelsize
+                da = dstimage[dstpos + 3] if alpha else 255
+                if srca == 65025 or srca == 0:
+                    op8(dstimage, dstpos, srcimage, srcpos, srca // 255, da, alpha)
+                    continue
+                op16(dstimage, dstpos, srcimage, srcpos, srca, da, alpha)
 
 # Gets the color of the in-between pixel at the given point
 # of the image, using bilinear interpolation.
@@ -2122,6 +2591,17 @@ def _bilerp(y0x0, y0x1, y1x0, y1x1, tx, ty):
 # components are 8 bits or fewer in length (as with images returned by blankimage()).
 # This function does not do any such conversion.
 def imagept(image, width, height, x, y, alpha=False):
+    return imagepts(image, width, height, [(x, y)], alpha=alpha)
+
+# Gets the colors of the in-between pixels at the given points of the
+# image, using bilinear interpolation, in the same way as imagept().
+# 'points' is a list of points, each a tuple of an x-coordinate and a
+# y-coordinate, neither of which need be an integer.
+# Returns a list of the colors' components, one color after another, in
+# the same format returned by the blankimage() method with the given value
+# of 'alpha'; thus, the colors of a row of points can be stored in a row
+# of an image in a single step.
+def imagepts(image, width, height, points, alpha=False):
     if width <= 0 or height <= 0:
         raise ValueError
     if not image:
@@ -2129,24 +2609,29 @@ def imagept(image, width, height, x, y, alpha=False):
     pixelBytes = 4 if alpha else 3
     if width * height * pixelBytes > len(image):
         raise ValueError
-    x = x % width
-    y = y % height
-    xi = int(x)
-    xi1 = (xi + 1) % width
-    yi = int(y)
-    yi1 = (yi + 1) % height
-    index = (yi * width + xi) * pixelBytes
-    y0x0 = image[index : index + pixelBytes]
-    index = (yi * width + xi1) * pixelBytes
-    y0x1 = image[index : index + pixelBytes]
-    index = (yi1 * width + xi) * pixelBytes
-    y1x0 = image[index : index + pixelBytes]
-    index = (yi1 * width + xi1) * pixelBytes
-    y1x1 = image[index : index + pixelBytes]
-    ret = [
-        ((int(_bilerp(y0x0[i], y0x1[i], y1x0[i], y1x1[i], x - xi, y - yi))))
-        for i in range(pixelBytes)
-    ]
+    stride = width * pixelBytes
+    ret = []
+    for x, y in points:
+        x = x % width
+        y = y % height
+        xi = int(x)
+        yi = int(y)
+        tx = x - xi
+        ty = y - yi
+        x0 = xi * pixelBytes
+        x1 = ((xi + 1) % width) * pixelBytes
+        y0 = yi * stride
+        y1 = ((yi + 1) % height) * stride
+        # Interpolate each component horizontally, then vertically
+        for y0x0, y0x1, y1x0, y1x1 in zip(
+            image[y0 + x0 : y0 + x0 + pixelBytes],
+            image[y0 + x1 : y0 + x1 + pixelBytes],
+            image[y1 + x0 : y1 + x0 + pixelBytes],
+            image[y1 + x1 : y1 + x1 + pixelBytes],
+        ):
+            top = y0x0 + (y0x1 - y0x0) * tx
+            bottom = y1x0 + (y1x1 - y1x0) * tx
+            ret.append(int(top + (bottom - top) * ty))
     return ret
 
 # Wallpaper group Pmm.  Source rectangle
@@ -2157,16 +2642,10 @@ def imagept(image, width, height, x, y, alpha=False):
 # 'x' and 'y' are each 0 or greater
 # and 1 or less.
 def pmm(x, y):
-    if x > 0.5:
-        if y < 0.5:
-            return ((0.5 - (x - 0.5)) * 2, y * 2)
-        else:
-            return ((0.5 - (x - 0.5)) * 2, (0.5 - (y - 0.5)) * 2)
-    else:
-        if y < 0.5:
-            return (x * 2, y * 2)
-        else:
-            return (x * 2, (0.5 - (y - 0.5)) * 2)
+    # Each coordinate is reflected independently of the other
+    rx = (0.5 - (x - 0.5)) * 2 if x > 0.5 else x * 2
+    ry = y * 2 if y < 0.5 else (0.5 - (y - 0.5)) * 2
+    return (rx, ry)
 
 # Wallpaper group P4m (triangle formed
 # from a rectangle and by
@@ -2194,6 +2673,30 @@ def p4malt(x, y):
         return (ry, rx)
     return (rx, ry)
 
+# Coefficients (ax, bx, cx, ay, by, cy) of the maps p3m1() uses to take
+# a point (xp, yp) to (ax*xp + bx*yp + cx, ay*xp + by*yp + cy)
+_P3m1Maps = [
+    (1, 0, 0, 0, 1, 0),
+    (-0.5, -0.75, 1, -1, 0.5, 1),
+    (-0.5, 0.75, 0.5, 1, 0.5, 0),
+]
+
+# For each column (0 through 5), row (0 or 1), and triangle half
+# (1 if left, 0 if right) of the area p3m1() divides its rectangle into,
+# indexed by column*4 + row*2 + half: whether the y-coordinate within the
+# row is reversed, followed by the coefficients of the map for that area
+_P3m1Areas = [
+    (flip,) + _P3m1Maps[m]
+    for flip, m in [
+        (1, 1), (0, 2), (0, 1), (1, 2),
+        (1, 0), (1, 1), (0, 0), (0, 1),
+        (1, 2), (1, 0), (0, 2), (0, 0),
+        (0, 1), (1, 2), (1, 1), (0, 2),
+        (0, 0), (0, 1), (1, 0), (1, 1),
+        (0, 2), (0, 0), (1, 2), (1, 0),
+    ]
+]
+
 # Wallpaper group P3m1.  Source triangle
 # is isosceles and is formed from a rectangle
 # by using the bottom edge as the triangle's
@@ -2202,87 +2705,31 @@ def p4malt(x, y):
 # to the right and the y-axis down
 def p3m1(x, y):
     xx = x * 6
-    xarea = min(5, int(xx))
+    xarea = 5 if xx >= 6 else int(xx)
+    if xarea < 0:
+        return (0, 0)
     xpos = xx - xarea
-    yarea = 0 if y < 0.5 else 1
-    ypos = y * 2 if y < 0.5 else (y - 0.5) * 2
-    isdiag1 = (xarea + yarea) % 2 == 0
-    leftHalf = (xpos + ypos) < 1.0 if isdiag1 else (xpos + (1 - ypos)) < 1.0
-    match (xarea, yarea, leftHalf):
-        case (1, 1, False) | (4, 0, False):
-            return (xpos / 2, ypos)
-        case (2, 1, True) | (5, 0, True):
-            return (xpos / 2 + 0.5, ypos)
-        case (1, 0, False) | (4, 1, False):
-            return ((xpos / 2), 1 - ypos)
-        case (2, 0, True) | (5, 1, True):
-            return ((xpos / 2 + 0.5), 1 - ypos)
-        case (0, 1, False) | (3, 0, False):
-            xp = xpos / 2
-            yp = ypos
-            newx = -xp / 2 - 3 * yp / 4 + 1
-            newy = -xp + yp / 2 + 1
-            newx = max(0, min(1, newx))
-            newy = max(0, min(1, newy))
-            return (newx, newy)
-        case (1, 1, True) | (4, 0, True):
-            xp = (xpos / 2) + 0.5
-            yp = ypos
-            newx = -xp / 2 - 3 * yp / 4 + 1
-            newy = -xp + yp / 2 + 1
-            newx = max(0, min(1, newx))
-            newy = max(0, min(1, newy))
-            return (newx, newy)
-        case (0, 0, False) | (3, 1, False):
-            xp = xpos / 2
-            yp = 1 - ypos
-            newx = -xp / 2 - 3 * yp / 4 + 1
-            newy = -xp + yp / 2 + 1
-            newx = max(0, min(1, newx))
-            newy = max(0, min(1, newy))
-            return (newx, newy)
-        case (1, 0, True) | (4, 1, True):
-            xp = (xpos / 2) + 0.5
-            yp = 1 - ypos
-            newx = -xp / 2 - 3 * yp / 4 + 1
-            newy = -xp + yp / 2 + 1
-            newx = max(0, min(1, newx))
-            newy = max(0, min(1, newy))
-            return (newx, newy)
-        case (2, 1, False) | (5, 0, False):
-            xp = xpos / 2
-            yp = ypos
-            newx = -xp / 2 + 3 * yp / 4 + 0.5
-            newy = xp + yp / 2
-            newx = max(0, min(1, newx))
-            newy = max(0, min(1, newy))
-            return (newx, newy)
-        case (3, 1, True) | (0, 0, True):
-            xp = (xpos / 2) + 0.5
-            yp = ypos
-            newx = -xp / 2 + 3 * yp / 4 + 0.5
-            newy = xp + yp / 2
-            newx = max(0, min(1, newx))
-            newy = max(0, min(1, newy))
-            return (newx, newy)
-        case (2, 0, False) | (5, 1, False):
-            xp = xpos / 2
-            yp = 1 - ypos
-            newx = -xp / 2 + 3 * yp / 4 + 0.5
-            newy = xp + yp / 2
-            newx = max(0, min(1, newx))
-            newy = max(0, min(1, newy))
-            return (newx, newy)
-        case (3, 0, True) | (0, 1, True):
-            xp = (xpos / 2) + 0.5
-            yp = 1 - ypos
-            newx = -xp / 2 + 3 * yp / 4 + 0.5
-            newy = xp + yp / 2
-            newx = max(0, min(1, newx))
-            newy = max(0, min(1, newy))
-            return (newx, newy)
-        case _:
-            return (0, 0)
+    if y < 0.5:
+        yarea = 0
+        ypos = y * 2
+    else:
+        yarea = 1
+        ypos = (y - 0.5) * 2
+    # Each area is split in half along one of its diagonals, which
+    # alternate from area to area
+    if (xarea + yarea) & 1:
+        leftHalf = (xpos + (1 - ypos)) < 1.0
+    else:
+        leftHalf = (xpos + ypos) < 1.0
+    flip, ax, bx, cx, ay, by, cy = _P3m1Areas[xarea * 4 + yarea * 2 + leftHalf]
+    xp = (xpos / 2) + 0.5 if leftHalf else xpos / 2
+    yp = 1 - ypos if flip else ypos
+    newx = ax * xp + bx * yp + cx
+    newy = ay * xp + by * yp + cy
+    # Clamp to the source rectangle
+    newx = 0 if newx < 0 else (1 if newx > 1 else newx)
+    newy = 0 if newy < 0 else (1 if newy > 1 else newy)
+    return (newx, newy)
 
 # Wallpaper group P6m (same source rectangle
 # as p3m1(), but exposing only the left half of
@@ -2291,9 +2738,7 @@ def p3m1(x, y):
 # and 1 or less.
 def p6m(x, y):
     rx, ry = p3m1(x, y)
-    if rx > 0.5:
-        rx = 1 - rx
-    return (rx, ry)
+    return (1 - rx if rx > 0.5 else rx, ry)
 
 # Wallpaper group P6m, alternative definition
 # (same source rectangle as p3m1(), but exposing
@@ -2302,9 +2747,7 @@ def p6m(x, y):
 # and 1 or less.
 def p6malt(x, y):
     rx, ry = p3m1(x, y)
-    if rx < 0.5:
-        rx = 1 - rx
-    return (rx, ry)
+    return (1 - rx if rx < 0.5 else rx, ry)
 
 # Wallpaper group P3m1, alternative definition.
 # Source triangle is isosceles and is formed from a rectangle
@@ -2332,10 +2775,9 @@ def p3m1alt2(x, y):
 # 'x' and 'y' are each 0 or greater
 # and 1 or less.
 def p6malt1a(x, y):
-    rx, ry = p3m1alt1(x, y)
-    if ry > 0.5:
-        ry = 1 - ry
-    return (rx, ry)
+    # Same as p3m1alt1(x, y), without the extra call
+    rx, ry = p3m1(y, 1 - x)
+    return (1 - ry, 1 - rx if rx > 0.5 else rx)
 
 # Wallpaper group P6m, alternative definition
 # (same source rectangle as p3m1alt1(), but exposing
@@ -2343,10 +2785,9 @@ def p6malt1a(x, y):
 # 'x' and 'y' are each 0 or greater
 # and 1 or less.
 def p6malt1b(x, y):
-    rx, ry = p3m1alt1(x, y)
-    if ry < 0.5:
-        ry = 1 - ry
-    return (rx, ry)
+    # Same as p3m1alt1(x, y), without the extra call
+    rx, ry = p3m1(y, 1 - x)
+    return (1 - ry, 1 - rx if rx < 0.5 else rx)
 
 # Wallpaper group P6m, alternative definition
 # (same source rectangle as p3m1alt2(), but exposing
@@ -2354,10 +2795,9 @@ def p6malt1b(x, y):
 # 'x' and 'y' are each 0 or greater
 # and 1 or less.
 def p6malt2a(x, y):
-    rx, ry = p3m1alt2(x, y)
-    if ry > 0.5:
-        ry = 1 - ry
-    return (rx, ry)
+    # Same as p3m1alt2(x, y), without the extra call
+    ry, rx = p3m1(y, x)
+    return (rx, 1 - ry if ry > 0.5 else ry)
 
 # Wallpaper group P6m, alternative definition
 # (same source rectangle as p3m1alt2(), but exposing
@@ -2365,10 +2805,9 @@ def p6malt2a(x, y):
 # 'x' and 'y' are each 0 or greater
 # and 1 or less.
 def p6malt2b(x, y):
-    rx, ry = p3m1alt2(x, y)
-    if ry < 0.5:
-        ry = 1 - ry
-    return (rx, ry)
+    # Same as p3m1alt2(x, y), without the extra call
+    ry, rx = p3m1(y, x)
+    return (rx, 1 - ry if ry < 0.5 else ry)
 
 # Creates an image based on a portion of a source
 # image, with the help of a wallpaper group function.
@@ -2400,16 +2839,56 @@ def wallpaperImage(
     if not groupFunc:
         groupFunc = pmm
     img = blankimage(width, height, alpha=alpha)
-    for y in range(height):
-        for x in range(width):
-            px, py = groupFunc(x / width, y / height)
-            sx = sx0 + (sx1 - sx0) * px
-            sy = sy0 + (sy1 - sy0) * py
-            pixel = imagept(srcImage, sw, sh, sx, sy, alpha=alpha)
-            if alpha:
-                setpixelalpha(img, width, height, x, y, pixel)
-            else:
-                setpixel(img, width, height, x, y, pixel)
+    pixelsize = 4 if alpha else 3
+    stride = width * pixelsize
+    # Normalized coordinates of each column and row, found once per call
+    xs = [x / width for x in range(width)]
+    ys = [y / height for y in range(height)]
+    # Size of the source rectangle
+    sxd = sx1 - sx0
+    syd = sy1 - sy0
+    # Wallpaper group functions map many points of the new image to
+    # the same point of the source rectangle, so the color at each such
+    # point is found only once
+    colors = {}
+    # pmm() reflects each coordinate independently of the other, and p4m()
+    # and p4malt() just swap the coordinates pmm() returns for some points,
+    # so for these groups each column and each row is reflected only once.
+    # Rows that pmm() reflects onto the same source row are then the same,
+    # so each such row is found only once.
+    reflected = groupFunc in (pmm, p4m, p4malt)
+    if reflected:
+        columns = [pmm(xp, 0)[0] for xp in xs]
+        reflectedrows = {}
+    for y, yp in enumerate(ys):
+        if reflected:
+            ry = pmm(0, yp)[1]
+            rowpixels = reflectedrows.get(ry)
+            if rowpixels is not None:
+                img[y * stride : (y + 1) * stride] = rowpixels
+                continue
+        if not reflected:
+            points = [groupFunc(xp, yp) for xp in xs]
+        elif groupFunc is pmm:
+            points = [(rx, ry) for rx in columns]
+        elif groupFunc is p4m:
+            points = [(ry, rx) if rx + (1 - ry) > 1.0 else (rx, ry) for rx in columns]
+        else:
+            points = [(ry, rx) if rx + (1 - ry) < 1.0 else (rx, ry) for rx in columns]
+        row = [colors.get(pt) for pt in points]
+        if None in row:
+            newpoints = list(
+                dict.fromkeys([pt for pt, c in zip(points, row) if c is None])
+            )
+            srcpoints = [(sx0 + sxd * px, sy0 + syd * py) for px, py in newpoints]
+            newcolors = imagepts(srcImage, sw, sh, srcpoints, alpha=alpha)
+            for i in range(len(newpoints)):
+                colors[newpoints[i]] = newcolors[i * pixelsize : (i + 1) * pixelsize]
+            row = [colors[pt] for pt in points]
+        rowpixels = [c for color in row for c in color]
+        if reflected:
+            reflectedrows[ry] = rowpixels
+        img[y * stride : (y + 1) * stride] = rowpixels
     return img
 
 # 'dstimage' and 'srcimage' have the same format returned by the blankimage() method with
@@ -2455,7 +2934,7 @@ def groupPmImage(img, width, height, alpha=False):
     rh = height
     ret = blankimage(rw, rh, alpha=alpha)
     imageblit(ret, rw, rh, 0, 0, img, width, height, alpha=alpha)
-    img2 = imagereversecolumnorder([x for x in img], width, height, alpha=alpha)
+    img2 = imagereversecolumnorder(img[:], width, height, alpha=alpha)
     imageblitex(
         ret,
         rw,
@@ -2484,7 +2963,7 @@ def groupPgImage(img, width, height, alpha=False):
     rh = height * 2 - 2
     ret = blankimage(rw, rh, alpha=alpha)
     imageblit(ret, rw, rh, 0, 0, img, width, height, alpha=alpha)
-    img2 = imagereverseroworder([x for x in img], width, height, alpha=alpha)
+    img2 = imagereverseroworder(img[:], width, height, alpha=alpha)
     imageblitex(
         ret,
         rw,
@@ -2507,8 +2986,28 @@ def groupPgImage(img, width, height, alpha=False):
 # The input image and the returned image have the same format returned by the blankimage() method with
 # the given value of 'alpha' (the default value for 'alpha' is False).
 def tileableImage(img, width, height, alpha=False):
-    i2, w2, h2 = groupPmImage(img, width, height, alpha=alpha)
-    return groupPgImage(i2, w2, h2, alpha=alpha)
+    if width < 2 or height < 2:
+        i2, w2, h2 = groupPmImage(img, width, height, alpha=alpha)
+        return groupPgImage(i2, w2, h2, alpha=alpha)
+    # Same result as groupPmImage followed by groupPgImage, but each row
+    # is built once from the source row and its mirror, and the mirrored
+    # rows are then appended in reverse order
+    pixelsize = 4 if alpha else 3
+    scan = width * pixelsize
+    rows = []
+    for y in range(height):
+        row = list(img[y * scan : (y + 1) * scan])
+        seg = row[pixelsize : scan - pixelsize]
+        mirror = seg[:]
+        for i in range(pixelsize):
+            mirror[i::pixelsize] = seg[i::pixelsize][::-1]
+        rows.append(row + mirror)
+    ret = []
+    for row in rows:
+        ret += row
+    for row in rows[height - 2 : 0 : -1]:
+        ret += row
+    return [ret, width * 2 - 2, height * 2 - 2]
 
 # 'srcimage' has the same format returned by the blankimage() method with
 # the given value of 'alpha' (the default value for 'alpha' is False).
@@ -2519,21 +3018,17 @@ def tiledImage(srcimage, srcwidth, srcheight, dstwidth, dstheight, alpha=False):
     if dstheight <= 0 or dstwidth <= 0 or srcwidth <= 0 or srcheight <= 0:
         return image
     columns = -((-dstwidth) // srcwidth)  # ceiling trick
-    rows = -((-dstheight) // srcheight)
-    for y in range(rows):
-        for x in range(columns):
-            imageblit(
-                image,
-                dstwidth,
-                dstheight,
-                x * srcwidth,
-                y * srcheight,
-                srcimage,
-                srcwidth,
-                srcheight,
-                wraparound=False,
-                alpha=alpha,
-            )
+    pixelsize = 4 if alpha else 3
+    srcscan = srcwidth * pixelsize
+    dstscan = dstwidth * pixelsize
+    # Each row of the tiling is a source row repeated across the width,
+    # so build each such row once and copy it to every row it occurs in
+    tiledrows = [
+        list((srcimage[y * srcscan : (y + 1) * srcscan] * columns)[:dstscan])
+        for y in range(min(srcheight, dstheight))
+    ]
+    for y in range(dstheight):
+        image[y * dstscan : (y + 1) * dstscan] = tiledrows[y % srcheight]
     return image
 
 # Images in 'sourceImages' have the same format returned by the blankimage() method with
@@ -2639,24 +3134,33 @@ def borderedgradientbox(
         y1 = min(y1, height)
         if x0 >= x1 or y0 >= y1:
             return
+    # Each row's colors are found first and then stored a run at a time
+    runs = _wrapruns(x0, x1, width)
+    colors = [(color[0], color[1], color[2]) for color in gradient]
+    # Contour x-coordinates of the columns that aren't border columns
+    xvs = [(x - x0) / (x1 - x0) for x in range(x0, x1)]
+    if border:
+        bordercolor = (border[0], border[1], border[2])
+        borderrow = bordercolor * (x1 - x0)
+        xvs = xvs[1:-1]
+    ypp = y0 % height
     for y in range(y0, y1):
-        ypp = y % height
         yv = (y - y0) / (y1 - y0)
         yp = ypp * width * 3
-        for x in range(x0, x1):
-            xp = x % width
-            if border and (y == y0 or y == y1 - 1 or x == x0 or x == x1 - 1):
-                # Draw border color
-                image[yp + xp * 3] = border[0]
-                image[yp + xp * 3 + 1] = border[1]
-                image[yp + xp * 3 + 2] = border[2]
-            else:
-                xv = (x - x0) / (x1 - x0)
-                c = _togray255(contour(xv, yv))
-                color = gradient[c]
-                image[yp + xp * 3] = color[0]
-                image[yp + xp * 3 + 1] = color[1]
-                image[yp + xp * 3 + 2] = color[2]
+        ypp += 1
+        if ypp == height:
+            ypp = 0
+        if border and (y == y0 or y == y1 - 1):
+            # Draw border color
+            row = borderrow
+        else:
+            row = [c for xv in xvs for c in colors[_togray255(contour(xv, yv))]]
+            if border:
+                row[:0] = bordercolor
+                if x1 - x0 > 1:
+                    row += bordercolor
+        for dx, x, count in runs:
+            image[yp + dx * 3 : yp + (dx + count) * 3] = row[x * 3 : (x + count) * 3]
 
 # Image has the same format returned by the blankimage() method with alpha=False.
 # Draw a wraparound box in a two-color dithered gradient fill on an image.
@@ -2693,29 +3197,85 @@ def bordereddithergradientbox(
         y1 = min(y1, height)
         if x0 >= x1 or y0 >= y1:
             return
+    # Each row's colors are found first and then stored a run at a time
+    runs = _wrapruns(x0, x1, width)
+    c1 = (color1[0], color1[1], color1[2])
+    c2 = (color2[0], color2[1], color2[2])
+    # Contour x-coordinates and dither matrix columns of the columns
+    # that aren't border columns
+    xvs = [(x - x0) / (x1 - x0) for x in range(x0, x1)]
+    xbits = [x & 7 for x in range(x0, x1)]
+    if border:
+        bordercolor = (border[0], border[1], border[2])
+        borderrow = bordercolor * (x1 - x0)
+        xvs = xvs[1:-1]
+        xbits = xbits[1:-1]
+    ypp = y0 % height
     for y in range(y0, y1):
-        ypp = y % height
         yv = (y - y0) / (y1 - y0)
         yp = ypp * width * 3
-        for x in range(x0, x1):
-            xp = x % width
-            if border and (y == y0 or y == y1 - 1 or x == x0 or x == x1 - 1):
-                # Draw border color
-                image[yp + xp * 3] = border[0]
-                image[yp + xp * 3 + 1] = border[1]
-                image[yp + xp * 3 + 2] = border[2]
-            else:
-                xv = (x - x0) / (x1 - x0)
-                c = _togray64(contour(xv, yv))
-                bdither = _DitherMatrix[(y & 7) * 8 + (x & 7)]
-                if bdither < c:
-                    image[yp + xp * 3] = color2[0]
-                    image[yp + xp * 3 + 1] = color2[1]
-                    image[yp + xp * 3 + 2] = color2[2]
-                else:
-                    image[yp + xp * 3] = color1[0]
-                    image[yp + xp * 3 + 1] = color1[1]
-                    image[yp + xp * 3 + 2] = color1[2]
+        ypp += 1
+        if ypp == height:
+            ypp = 0
+        ditherrow = (y & 7) * 8
+        if border and (y == y0 or y == y1 - 1):
+            # Draw border color
+            row = borderrow
+        else:
+            row = [
+                c
+                for xv, xbit in zip(xvs, xbits)
+                for c in (
+                    c2
+                    if _DitherMatrix[ditherrow + xbit] < _togray64(contour(xv, yv))
+                    else c1
+                )
+            ]
+            if border:
+                row[:0] = bordercolor
+                if x1 - x0 > 1:
+                    row += bordercolor
+        for dx, x, count in runs:
+            image[yp + dx * 3 : yp + (dx + count) * 3] = row[x * 3 : (x + count) * 3]
+
+# Two-level alpha values for each alpha value, by thresholding
+_TwoLevelAlpha = bytes(0 if a <= 127 else 255 for a in range(256))
+# Each value from 0 through 255 scaled to 0 through 64, for comparison with
+# the entries of _DitherMatrix
+_Scale64 = [a * 64 // 255 for a in range(256)]
+# For each entry of _DitherMatrix, the value (0 or 255) that each value
+# from 0 through 255 becomes by two-level dithering
+_DitherTwoLevel = [
+    bytes(255 if d < _Scale64[a] else 0 for a in range(256)) for d in range(64)
+]
+
+# Replaces the elements of the given slice of an image with the entries of
+# 'table' (a 'bytes' with 256 entries) they index; on a 'bytearray', this is
+# done in a single step by bytearray.translate().
+def _translateslice(image, sl, table):
+    if isinstance(image, bytearray):
+        image[sl] = image[sl].translate(table)
+    else:
+        image[sl] = [table[v] for v in image[sl]]
+
+# Dithers in place the color components of the given image; each component
+# becomes the entry it indexes in the table, among 'tables', for the pixel's
+# entry in _DitherMatrix ('tables' holds a 256-entry 'bytes' for each of the
+# 64 entries).  Every eighth pixel of a row has the same entry, so each row
+# is dithered as eight strided slices for each color channel.
+def _ditherchannels(image, width, height, pixelSize, tables):
+    stride = width * pixelSize
+    for y in range(height):
+        yp = y * stride
+        ditherrow = _DitherMatrix[(y & 7) * 8 : (y & 7) * 8 + 8]
+        for x in range(min(width, 8)):
+            table = tables[ditherrow[x]]
+            for i in range(3):
+                _translateslice(
+                    image,
+                    slice(yp + x * pixelSize + i, yp + stride, pixelSize * 8),
+                    table,
+                )
 
 # Modifies the given 4-byte-per-pixel image by
 # converting its 256-level alpha channel to two levels (opaque
@@ -2729,18 +3289,24 @@ def bordereddithergradientbox(
 # done by thresholding: alpha values 127 or below become 0 (transparent), and
 # alpha values 128 or higher become 255 (opaque).  Default is False
 def alphaToTwoLevel(image, width, height, dither=False):
-    i = 0
+    # The alpha channel is converted by table lookups over strided slices.
+    # Alpha values of 0 and 255 come out unchanged under either
+    # conversion, so they need no special case.
+    stride = width * 4
+    if not dither:
+        _translateslice(image, slice(3, height * stride, 4), _TwoLevelAlpha)
+        return image
     for y in range(height):
-        for x in range(width):
-            a = image[i + 3]
-            if a != 0 and a != 255:
-                if dither:
-                    bdither = _DitherMatrix[(y & 7) * 8 + (x & 7)]
-                    a = 255 if bdither < a * 64 // 255 else 0
-                    image[i + 3] = a
-                else:
-                    image[i + 3] = 0 if a <= 127 else 255
-            i += 4
+        pos = y * stride + 3
+        ditherrow = _DitherMatrix[(y & 7) * 8 : (y & 7) * 8 + 8]
+        # Every eighth pixel of the row, starting at each of the first
+        # eight, uses the same dither matrix entry
+        for x in range(min(width, 8)):
+            _translateslice(
+                image,
+                slice(pos + x * 4, pos + stride, 32),
+                _DitherTwoLevel[ditherrow[x]],
+            )
     return image
 
 # Splits a 4-byte-per pixel image (four elements per pixel) into a
@@ -2751,22 +3317,18 @@ def alphaToTwoLevel(image, width, height, dither=False):
 def splitmask(image, width, height):
     if width * height * 4 != len(image):
         raise ValueError
-    img = [0 for _ in range(width * height * 3)]
-    mask = [0 for _ in range(width * height * 3)]
-    for i in range(width * height):
-        if image[i * 4 + 3] == 0:
-            # Set color to black for every transparent pixel,
-            # to ease the color mask's use as an XOR mask
-            # (when every pixel in the alpha mask's bits are all zeros or all ones)
-            img[i * 3] = img[i * 3 + 1] = img[i * 3 + 2] = 0
-            mask[i * 3] = mask[i * 3 + 1] = mask[i * 3 + 2] = 255
-        else:
-            img[i * 3] = image[i * 4]
-            img[i * 3 + 1] = image[i * 4 + 1]
-            img[i * 3 + 2] = image[i * 4 + 2]
-            # Invert alpha channel to ease the alpha mask's use as an AND mask
-            # (when the bits of every pixel in the mask are all zeros or all ones)
-            mask[i * 3] = mask[i * 3 + 1] = mask[i * 3 + 2] = 255 - image[i * 4 + 3]
+    img = [0] * (width * height * 3)
+    mask = [0] * (width * height * 3)
+    alphas = image[3::4]
+    for i in range(3):
+        # Set color to black for every transparent pixel,
+        # to ease the color mask's use as an XOR mask
+        # (when every pixel in the alpha mask's bits are all zeros or all ones)
+        img[i::3] = [c if a else 0 for c, a in zip(image[i::4], alphas)]
+    # Invert alpha channel to ease the alpha mask's use as an AND mask
+    # (when the bits of every pixel in the mask are all zeros or all ones);
+    # transparent pixels thus become 255
+    mask[0::3] = mask[1::3] = mask[2::3] = [255 - a for a in alphas]
     return [img, mask]
 
 # Draws a 3D outline over a 4-byte-per-pixel image with transparent
@@ -2775,27 +3337,35 @@ def splitmask(image, width, height):
 # 'lt' is the light color.  If not given, is [128,128,128].
 # 'sh' is the shadow color.  If not given, is [0,0,0].
 def outlineimage(image, width, height, lt=None, sh=None):
+    ltcolor = [lt[0], lt[1], lt[2]] if lt else [0x80, 0x80, 0x80]
+    shcolor = [sh[0], sh[1], sh[2]] if sh else [0x00, 0x00, 0x00]
+    stride = width * 4
     for y in range(height):
+        yp = y * stride
+        # Alpha values of this row and of the rows above and below, if any.
+        # Only color components are changed, so these stay valid.
+        alphas = image[yp + 3 : yp + stride : 4]
+        above = image[yp - stride + 3 : yp : 4] if y > 0 else None
+        below = image[yp + stride + 3 : yp + stride * 2 : 4] if y < height - 1 else None
+        xp = yp
         for x in range(width):
-            xp = (y * width + x) * 4
-            # Draw upper left outline gray
+            opaque = alphas[x] == 255
             if (
-                image[xp + 3] == 255
-                and (x == 0 or image[(xp - 4) + 3] != 255)
-                or (y == 0 or image[(xp - width * 4) + 3] != 255)
+                opaque
+                and (x == width - 1 or alphas[x + 1] != 255)
+                or (below is None or below[x] != 255)
             ):
-                image[xp] = lt[0] if lt else 0x80
-                image[xp + 1] = lt[1] if lt else 0x80
-                image[xp + 2] = lt[2] if lt else 0x80
-            # "Then" draw lower right outline black
-            if (
-                image[xp + 3] == 255
-                and (x == width - 1 or image[(xp + 4) + 3] != 255)
-                or (y == height - 1 or image[(xp + width * 4) + 3] != 255)
+                # Draw lower right outline black (drawn "after" the
+                # upper left outline)
+                image[xp : xp + 3] = shcolor
+            elif (
+                opaque
+                and (x == 0 or alphas[x - 1] != 255)
+                or (above is None or above[x] != 255)
             ):
-                image[xp] = sh[0] if sh else 0x00
-                image[xp + 1] = sh[1] if sh else 0x00
-                image[xp + 2] = sh[2] if sh else 0x00
+                # Draw upper left outline gray
+                image[xp : xp + 3] = ltcolor
+            xp += 4
 
 # Draw a wraparound dither-colored box on an image.
 # Image has the same format returned by the blankimage() method with alpha=False.
@@ -2824,26 +3394,38 @@ def borderedbox(
         y1 = min(y1, height)
         if x0 >= x1 or y0 >= y1:
             return
+    # The color of each pixel depends only on whether its wrapped row and
+    # column have the same parity, so the two possible rows of the box are
+    # built once and then stored a run at a time.
+    runs = _wrapruns(x0, x1, width)
+    c1 = (color1[0], color1[1], color1[2])
+    c2 = (color2[0], color2[1], color2[2])
+    xparity = [(x % width) & 1 for x in range(x0, x1)]
+    if border:
+        bordercolor = (border[0], border[1], border[2])
+        borderrow = bordercolor * (x1 - x0)
+        xparity = xparity[1:-1]
+    rows = []
+    for rowparity in (0, 1):
+        row = [c for xp in xparity for c in (c2 if xp ^ rowparity else c1)]
+        if border:
+            row[:0] = bordercolor
+            if x1 - x0 > 1:
+                row += bordercolor
+        rows.append(row)
+    ypp = y0 % height
     for y in range(y0, y1):
-        ypp = y % height
         yp = ypp * width * 3
-        for x in range(x0, x1):
-            xp = x % width
-            if border and (y == y0 or y == y1 - 1 or x == x0 or x == x1 - 1):
-                # Draw border color
-                image[yp + xp * 3] = border[0]
-                image[yp + xp * 3 + 1] = border[1]
-                image[yp + xp * 3 + 2] = border[2]
-            elif ypp % 2 == xp % 2:
-                # Draw first color
-                image[yp + xp * 3] = color1[0]
-                image[yp + xp * 3 + 1] = color1[1]
-                image[yp + xp * 3 + 2] = color1[2]
-            else:
-                # Draw second color
-                image[yp + xp * 3] = color2[0]
-                image[yp + xp * 3 + 1] = color2[1]
-                image[yp + xp * 3 + 2] = color2[2]
+        if border and (y == y0 or y == y1 - 1):
+            # Draw border color
+            row = borderrow
+        else:
+            row = rows[ypp & 1]
+        for dx, x, count in runs:
+            image[yp + dx * 3 : yp + (dx + count) * 3] = row[x * 3 : (x + count) * 3]
+        ypp += 1
+        if ypp == height:
+            ypp = 0
 
 # Split an image into two interlaced versions with half the height.
 # Image has the same format returned by the blankimage() method with the given value of 'alpha' (default value for 'alpha' is False).
@@ -2853,14 +3435,14 @@ def interlace(image, width, height, alpha=False):
     if height % 2 != 0:
         raise ValueError("height must be even")
     bypp = 4 if alpha else 3
-    image1 = listsum(
-        image[(y * 2) * width * bypp : (y * 2 + 1) * width * bypp]
-        for y in range(height // 2)
-    )
-    image2 = listsum(
-        image[(y * 2 + 1) * width * bypp : (y * 2 + 2) * width * bypp]
-        for y in range(height // 2)
-    )
+    scan = width * bypp
+    # Even rows go to the first image, odd rows to the second; each row is
+    # appended in place rather than by concatenating new lists
+    image1 = []
+    image2 = []
+    for y in range(0, height, 2):
+        image1 += image[y * scan : (y + 1) * scan]
+        image2 += image[(y + 1) * scan : (y + 2) * scan]
     return [image1, image2]
 
 # Creates a blank image with 3 or 4 bytes per pixel and the given width, height,
@@ -2881,6 +3463,14 @@ def interlace(image, width, height, alpha=False):
 # or [0,0,0] (3 bytes per pixel) is "black", and [255,255,255,255] or [255,255,255] is "white".
 # Each color in the returned image is assumed to be in the nonlinear sRGB color space.
 #
+# The functions in this module that draw boxes on or copy between images (simplebox(),
+# borderedbox(), borderedgradientbox(), bordereddithergradientbox(), hatchedbox(),
+# imageblit(), imageblitex(), and imagetransblit()) also accept, in place of the
+# list, a 'bytearray' with the same layout, such as
+# 'bytearray(blankimage(width, height))'.  These functions run faster on a
+# 'bytearray', since its bytes can be copied without converting each of them to a
+# Python integer.
+#
 # 'color' is the fill color; if 'color' is None, the fill color is [255,255,255,255], or white.
 # If 'alpha' is True, generates a 4-byte-per-pixel image; if False, generates a
 # 3-byte-per-pixel image.  The default is False.
@@ -2896,18 +3486,29 @@ def blankimage(width, height, color=None, alpha=False):
     if color and len(color) < (4 if alpha else 3):
         raise ValueError
     # default background is white; default alpha is 255
-    image = [255 for i in range(width * height * (4 if alpha else 3))]
     if color:
-        pos = 0
-        pixelBytes = 4 if alpha else 3
-        for i in range(height * width):
-            image[pos] = color[0]
-            image[pos + 1] = color[1]
-            image[pos + 2] = color[2]
-            if alpha:
-                image[pos + 3] = color[3]
-            pos += pixelBytes
-    return image
+        pixel = [color[0], color[1], color[2]] + ([color[3]] if alpha else [])
+        return pixel * (width * height)
+    return [255] * (width * height * (4 if alpha else 3))
+
+# Returns, for each row of an argyle pattern of the given size, the run of
+# columns inside the shape in its middle as a tuple (start, end), where
+# 'end' is exclusive.  The run is empty if the row has no such columns.
+def _argyleruns(width, height, expo):
+    # Term of the shape's equation for each column, found once per call.
+    # The terms fall and then rise from left to right, so the part of each
+    # row inside the shape is a single run of columns.
+    colterms = [abs((x / width) * 2 - 1) ** expo for x in range(width)]
+    ret = []
+    for y in range(height):
+        yp = (y / height) * 2 - 1
+        rowterm = abs(yp) ** expo
+        inside = [colterm + rowterm <= 1 for colterm in colterms]
+        if True in inside:
+            ret.append((inside.index(True), width - inside[::-1].index(True)))
+        else:
+            ret.append((0, 0))
+    return ret
 
 # Generates a tileable argyle pattern from two images of the
 # same size.  The images have the same format returned by the blankimage()
@@ -2949,20 +3550,15 @@ def argyle(
             foregroundImage, i2, width, height, expo, shiftImageBg=False, alpha=alpha
         )
     ret = blankimage(width, height, alpha=alpha)
-    pos = 0
-    for y in range(height):
-        yp = (y / height) * 2 - 1
-        for x in range(width):
-            xp = (x / width) * 2 - 1
-            if abs(xp) ** expo + abs(yp) ** expo <= 1:
-                # image 1 is inside the diamond
-                for i in range(pixelBytes):
-                    ret[pos + i] = foregroundImage[pos + i]
-            else:
-                # image 2 is outside the diamond
-                for i in range(pixelBytes):
-                    ret[pos + i] = backgroundImage[pos + i]
-            pos += pixelBytes
+    scan = width * pixelBytes
+    for y, (x0, x1) in enumerate(_argyleruns(width, height, expo)):
+        pos = y * scan
+        # image 2 is outside the diamond
+        ret[pos : pos + scan] = backgroundImage[pos : pos + scan]
+        # image 1 is inside the diamond
+        start = pos + x0 * pixelBytes
+        end = pos + x1 * pixelBytes
+        ret[start:end] = foregroundImage[start:end]
     if width * height * pixelBytes > len(ret):
         raise ValueError
     return ret
@@ -3011,34 +3607,45 @@ def checkerboard(
 ):
     if rows <= 0 or columns <= 0 or rows % 2 == 1 or columns % 2 == 1:
         raise ValueError
-    ret = blankimage(width, height, alpha=alpha)
-    pos = 0
     pixelBytes = 4 if alpha else 3
+    if width * height * pixelBytes > len(upperLeftImage):
+        raise ValueError
+    if width * height * pixelBytes > len(otherImage):
+        raise ValueError
+    ret = blankimage(width, height, alpha=alpha)
+    # Runs of columns in the same tile column, as [start, end, tile column],
+    # found once per call; each run of each row is then copied at once
+    runs = []
+    for x in range(width):
+        xp = x * columns // width
+        if runs and runs[-1][2] == xp:
+            runs[-1][1] = x + 1
+        else:
+            runs.append([x, x + 1, xp])
     for y in range(height):
         yp = y * rows // height
-        for x in range(width):
-            xp = x * columns // width
-            if (yp + xp) % 2 == 0:
-                ret[pos] = upperLeftImage[pos]
-                ret[pos + 1] = upperLeftImage[pos + 1]
-                ret[pos + 2] = upperLeftImage[pos + 2]
-                if alpha:
-                    ret[pos + 3] = upperLeftImage[pos + 3]
-            else:
-                ret[pos] = otherImage[pos]
-                ret[pos + 1] = otherImage[pos + 1]
-                ret[pos + 2] = otherImage[pos + 2]
-                if alpha:
-                    ret[pos + 3] = otherImage[pos + 3]
-            pos += pixelBytes
+        pos = y * width * pixelBytes
+        for start, end, xp in runs:
+            src = upperLeftImage if (yp + xp) % 2 == 0 else otherImage
+            ret[pos + start * pixelBytes : pos + end * pixelBytes] = src[
+                pos + start * pixelBytes : pos + end * pixelBytes
+            ]
+    return ret
+
+# Same as argyle() on two solid-color images of the given colors (with
+# expo=1), but builds each row directly from the two colors.
+def _solidargyle(fgcolor, bgcolor, w, h, alpha=False):
+    fgpixel = blankimage(1, 1, fgcolor, alpha=alpha)
+    bgpixel = blankimage(1, 1, bgcolor, alpha=alpha)
+    ret = []
+    for x0, x1 in _argyleruns(w, h, 1):
+        ret += bgpixel * x0 + fgpixel * (x1 - x0) + bgpixel * (w - x1)
     return ret
 
 # Returns an image with the same format returned by the blankimage() method with
 # the given value of 'alpha' (the default value for 'alpha' is False).
 def simpleargyle(fgcolor, bgcolor, linecolor, w, h, alpha=False):
-    fg = blankimage(w, h, fgcolor, alpha=alpha)
-    bg = blankimage(w, h, bgcolor, alpha=alpha)
-    bg = argyle(fg, bg, w, h, alpha=alpha)
+    bg = _solidargyle(fgcolor, bgcolor, w, h, alpha=alpha)
     linedraw(bg, w, h, linecolor, 0, 0, w, h)
     linedraw(bg, w, h, linecolor, 0, h, w, 0)
     return bg
@@ -3064,9 +3671,7 @@ def doubleargyleimage(fg1Image, fg2Image, bgImage, w, h, alpha=False):
 
 # Returns an image with the same format returned by the blankimage() method with alpha=False.
 def simpleargyle2(fgcolor, bgcolor, linecolor, w, h):
-    fg = blankimage(w, h, fgcolor)
-    bg = blankimage(w, h, bgcolor)
-    bg = argyle(fg, bg, w, h)
+    bg = _solidargyle(fgcolor, bgcolor, w, h)
     linedraw(bg, w, h, linecolor, 2, 0, w + 2, h, wraparound=True)
     linedraw(bg, w, h, linecolor, -2, 0, w - 2, h, wraparound=True)
     linedraw(bg, w, h, linecolor, 2, h, w + 2, 0, wraparound=True)
@@ -3076,11 +3681,11 @@ def simpleargyle2(fgcolor, bgcolor, linecolor, w, h):
 def _nearest_rgb3(pal, r, g, b):
     best = -1
     ret = 0
-    for i in range(len(pal)):
-        cr = pal[i][0]
-        cg = pal[i][1]
-        cb = pal[i][2]
-        dist = (r - cr) ** 2 + (g - cg) ** 2 + (b - cb) ** 2
+    for i, can in enumerate(pal):
+        dr = r - can[0]
+        dg = g - can[1]
+        db = b - can[2]
+        dist = dr * dr + dg * dg + db * db
         if i == 0 or dist < best:
             ret = i
             best = dist
@@ -3164,6 +3769,15 @@ def drawdiagstripe(image, width, height, stripesize, reverse, fgcolor=None):
     v = u - 2 * dlong
     z = u - dlong
     shortCoord = shortStart
+    if xIsLong:
+        if width > 0 and height > 0 and not image:
+            raise ValueError
+        # The stripe is a column of pixels for each column of the image.
+        # Since every pixel gets the same color, the columns are gathered
+        # for each row first, and each row is then filled a run of adjacent
+        # columns at a time, rather than a column at a time.
+        rowcolumns = [[] for _ in range(height)]
+        rowcount = min(stripesize, height)
     for longCoord in range(longStart, longEnd + 1):
         if longCoord == longEnd:
             shortCoord = shortEnd
@@ -3175,16 +3789,8 @@ def drawdiagstripe(image, width, height, stripesize, reverse, fgcolor=None):
                 z += v
         if xIsLong:
             xc = width - 1 - longCoord if reverse else longCoord
-            simplebox(
-                image,
-                width,
-                height,
-                fgcolor,
-                xc,
-                shortCoord + xpstart,
-                xc + 1,
-                shortCoord + xpend,
-            )
+            for y in range(shortCoord + xpstart, shortCoord + xpstart + rowcount):
+                rowcolumns[y % height].append(xc)
         else:
             xc = width - 1 - shortCoord if reverse else shortCoord
             simplebox(
@@ -3197,6 +3803,19 @@ def drawdiagstripe(image, width, height, stripesize, reverse, fgcolor=None):
                 xc + xpend,
                 longCoord + 1,
             )
+    if xIsLong:
+        pixel = [fgcolor[0], fgcolor[1], fgcolor[2]]
+        for y, columns in enumerate(rowcolumns):
+            columns.sort()
+            i = 0
+            while i < len(columns):
+                # Find the run of adjacent columns starting here
+                j = i + 1
+                while j < len(columns) and columns[j] == columns[j - 1] + 1:
+                    j += 1
+                pos = (y * width + columns[i]) * 3
+                image[pos : pos + (j - i) * 3] = pixel * (j - i)
+                i = j
 
 # Finds the gray tones in the given color palette and returns
 # a sorted list of them.
@@ -3239,30 +3858,48 @@ def dithertograyimage(image, width, height, grays, alpha=False, ignoreNonGrays=F
         ):
             raise ValueError
     pixelSize = 4 if alpha else 3
+    stride = width * pixelSize
+    # For each gray level found so far: the grays it's dithered between
+    # (the lower and then the higher one) and its dither threshold.
+    # Levels outside the range of the grays become 0.
+    levels = {}
+    # Rows don't depend on each other, so each row is processed as a whole,
+    # a color channel at a time, using strided slices
     for y in range(height):
-        yp = y * width * pixelSize
-        for x in range(width):
-            xp = yp + x * pixelSize
-            c = image[xp]
-            if ignoreNonGrays:
-                if image[xp] != image[xp + 1] or image[xp + 1] != image[xp + 2]:
-                    continue
-            else:
-                c = (
-                    image[xp] * 2126 + image[xp + 1] * 7152 + image[xp + 2] * 722
-                ) // 10000
-            r = 0
-            bdither = _DitherMatrix[(y & 7) * 8 + (x & 7)]
+        yp = y * stride
+        ye = yp + stride
+        channels = [image[yp + i : ye : pixelSize] for i in range(3)]
+        if ignoreNonGrays:
+            rowgrays = [r if r == g and g == b else None for r, g, b in zip(*channels)]
+        else:
+            rowgrays = [
+                (r * 2126 + g * 7152 + b * 722) // 10000 for r, g, b in zip(*channels)
+            ]
+        for c in set(rowgrays):
+            if c is None or c in levels:
+                continue
+            level = (0, 0, 0)
             for i in range(1, len(grays)):
                 if c >= grays[i - 1] and c <= grays[i]:
-                    r = (
-                        grays[i]
-                        if bdither
-                        < (c - grays[i - 1]) * 64 // (grays[i] - grays[i - 1])
-                        else grays[i - 1]
+                    level = (
+                        grays[i - 1],
+                        grays[i],
+                        (c - grays[i - 1]) * 64 // (grays[i] - grays[i - 1]),
                     )
                     break
-            image[xp] = image[xp + 1] = image[xp + 2] = r
+            levels[c] = level
+        ditherrow = _DitherMatrix[(y & 7) * 8 : (y & 7) * 8 + 8] * (width // 8 + 1)
+        # New gray of each pixel, or None for a pixel left unchanged
+        row = [
+            None if level is None else (level[1] if d < level[2] else level[0])
+            for level, d in zip([levels.get(c) for c in rowgrays], ditherrow)
+        ]
+        for i in range(3):
+            image[yp + i : ye : pixelSize] = (
+                [v if c is None else c for v, c in zip(channels[i], row)]
+                if ignoreNonGrays
+                else row
+            )
     return image
 
 # Converts the image to grayscale and maps the resulting gray tones
@@ -3273,28 +3910,39 @@ def dithertograyimage(image, width, height, grays, alpha=False, ignoreNonGrays=F
 # in the image unchanged.  Default is False.
 def graymap(image, width, height, colors=None, alpha=False, ignoreNonGrays=False):
     pixelSize = 4 if alpha else 3
+    stride = width * pixelSize
+    # Each row is processed a color channel at a time, using strided slices
     for y in range(height):
-        yp = y * width * pixelSize
-        for x in range(width):
-            xp = yp + x * pixelSize
-            c = image[xp]
-            if c != image[xp + 1] or image[xp + 1] != image[xp + 2]:
-                if ignoreNonGrays:
-                    continue
-                # Not a gray pixel, so find gray value
-                c = (
-                    image[xp] * 2126 + image[xp + 1] * 7152 + image[xp + 2] * 722
-                ) // 10000
-            if colors:
-                col = colors[c]
-                if not col:
-                    # No color defined at this index
-                    raise ValueError
-                image[xp] = col[0]
-                image[xp + 1] = col[1]
-                image[xp + 2] = col[2]
-            else:
-                image[xp] = image[xp + 1] = image[xp + 2] = c
+        yp = y * stride
+        ye = yp + stride
+        channels = [image[yp + i : ye : pixelSize] for i in range(3)]
+        # Gray value of each pixel, or None for a pixel left unchanged
+        if ignoreNonGrays:
+            grays = [r if r == g and g == b else None for r, g, b in zip(*channels)]
+        else:
+            # Find the gray value of pixels that aren't gray
+            grays = [
+                r if r == g and g == b else (r * 2126 + g * 7152 + b * 722) // 10000
+                for r, g, b in zip(*channels)
+            ]
+        if colors:
+            cols = [
+                pixel if c is None else colors[c]
+                for c, pixel in zip(grays, zip(*channels))
+            ]
+            if not all(cols):
+                # No color defined at this index
+                raise ValueError
+            for i in range(3):
+                image[yp + i : ye : pixelSize] = [col[i] for col in cols]
+        elif ignoreNonGrays:
+            for i in range(3):
+                image[yp + i : ye : pixelSize] = [
+                    v if c is None else c for v, c in zip(channels[i], grays)
+                ]
+        else:
+            for i in range(3):
+                image[yp + i : ye : pixelSize] = grays
     return image
 
 # Converts an image without an alpha channel to an image with an alpha channel by
@@ -3304,17 +3952,15 @@ def graymap(image, width, height, colors=None, alpha=False, ignoreNonGrays=False
 def toalpha(image, width, height):
     if width * height * 3 != len(image):
         raise ValueError
-    ret = [0 for x in range(width * height * 4)]
-    pos = 0
-    apos = 0
-    for i in range(width * height):
-        ret[apos] = image[pos]
-        ret[apos + 1] = image[pos + 1]
-        ret[apos + 2] = image[pos + 2]
-        ret[apos + 3] = 0xFF
-        apos += 4
-        pos += 3
-    return ret
+    # Copy a color channel at a time with strided slices; for a byte string
+    # or bytearray, the copying is faster into a bytearray converted to a
+    # list afterwards
+    packed = isinstance(image, (bytes, bytearray))
+    ret = bytearray(b"\xff") if packed else [0xFF]
+    ret *= width * height * 4
+    for i in range(3):
+        ret[i::4] = image[i::3]
+    return list(ret) if packed else ret
 
 # Converts an image with an alpha channel to an image without an alpha channel by
 # removing that alpha channel.
@@ -3323,15 +3969,15 @@ def toalpha(image, width, height):
 def noalpha(image, width, height):
     if width * height * 4 != len(image):
         raise ValueError
-    ret = [0 for x in range(width * height * 3)]
-    pos = 0
-    apos = 0
-    for i in range(width * height):
-        ret[pos] = image[apos]
-        ret[pos + 1] = image[apos + 1]
-        ret[pos + 2] = image[apos + 2]
-        apos += 4
-        pos += 3
+    # Copy the image, then delete every alpha component with a
+    # single strided slice; for a byte string or bytearray, the deletion
+    # is faster in a bytearray converted to a list afterwards
+    if isinstance(image, (bytes, bytearray)):
+        ret = bytearray(image)
+        del ret[3::4]
+        return list(ret)
+    ret = list(image)
+    del ret[3::4]
     return ret
 
 # Image has the same format returned by the blankimage() method with alpha=False.
@@ -3402,6 +4048,22 @@ def setpixelbgralpha(image, width, height, x, y, c):
 
 # Image has the same format returned by the blankimage() method with alpha=False.
 def convolveRow(image, width, height):
+    if width >= 50:
+        # Each column is in the 50-pixel window at most once, so the sum of
+        # the window can be kept as a running sum, a color channel at a
+        # time.  As before, each pixel is replaced as soon as it's found,
+        # so later windows see the new value.
+        stride = width * 3
+        for y in range(height):
+            for i in range(3):
+                v = image[y * stride + i : (y + 1) * stride : 3]
+                s = sum(v[x - 25] for x in range(50))
+                for x in range(width):
+                    new = s // 50
+                    s += new - v[x] - v[x - 25] + v[(x + 25) % width]
+                    v[x] = new
+                image[y * stride + i : (y + 1) * stride : 3] = v
+        return
     pos = 0
     for y in range(height):
         rowstart = pos
@@ -3421,29 +4083,20 @@ def convolveRow(image, width, height):
 
 # Image has the same format returned by the blankimage() method with the given value of 'alpha' (default value for 'alpha' is False).
 def imagetranspose(image, width, height, alpha=False):
-    image2 = blankimage(height, width, alpha=alpha)
-    if alpha:
-        for y in range(height):
-            for x in range(width):
-                setpixelalpha(
-                    image2,
-                    height,
-                    width,
-                    y,
-                    x,
-                    getpixelalpha(image, width, height, x, y),
-                )
-    else:
-        for y in range(height):
-            for x in range(width):
-                setpixel(
-                    image2,
-                    height,
-                    width,
-                    y,
-                    x,
-                    getpixel(image, width, height, x, y),
-                )
+    pixelsize = 4 if alpha else 3
+    stride = width * pixelsize
+    end = height * stride
+    # Every component is overwritten below, so start from zeros rather
+    # than a blankimage() fill
+    image2 = [0] * end
+    # Each column of the image becomes a row of the new image; copy it
+    # a color channel at a time with strided slices
+    for x in range(width):
+        row = x * height * pixelsize
+        for i in range(pixelsize):
+            image2[row + i : row + height * pixelsize : pixelsize] = image[
+                x * pixelsize + i : end : stride
+            ]
     return image2
 
 # Create a twice-as-wide image inspired by the style used
@@ -3454,13 +4107,18 @@ def _ditherstyle(image, width, height, bgcolor=None, alpha=False):
         bgcolor = [192, 192, 192, 255]
     if len(bgcolor) == 3 and alpha:
         bgcolor = bgcolor[0:3] + [255]
-    gp = getpixelalpha if alpha else getpixel
-    sp = setpixelalpha if alpha else setpixel
+    pixelBytes = 4 if alpha else 3
+    stride = width * pixelBytes
+    bgrow = [bgcolor[i] for i in range(pixelBytes)] * (width * 2)
     for y in range(height):
-        for x in range(width):
-            c = gp(image, width, height, x, y)
-            sp(image2, width * 2, height, x * 2, y, c if y % 2 == 0 else bgcolor)
-            sp(image2, width * 2, height, x * 2 + 1, y, bgcolor if y % 2 == 0 else c)
+        # The image's pixels go in even columns on even rows and in odd
+        # columns on odd rows; the rest are the background color
+        row = bgrow[:]
+        start = 0 if y % 2 == 0 else pixelBytes
+        src = image[y * stride : (y + 1) * stride]
+        for i in range(pixelBytes):
+            row[start + i :: pixelBytes * 2] = src[i::pixelBytes]
+        image2[y * stride * 2 : (y + 1) * stride * 2] = row
     return image2
 
 # Image has the same format returned by the blankimage() method with the given value of 'alpha' (default value for 'alpha' is False).
@@ -3481,6 +4139,34 @@ def tograyditherstyle(image, width, height, palette=None, light=False, alpha=Fal
         graymap(im, width, height, colors, alpha=alpha)
     return _ditherstyle(im, width, height, alpha=alpha)
 
+# For each entry of _DitherMatrix, the value that each value from 0 through 255
+# becomes when dithered to the nearest multiples of 51 (as in websafeDither())
+_WebsafeDither = [
+    bytes(
+        (c - c % 51) + 51 if d < (c % 51) * 64 // 51 else c - c % 51
+        for c in range(256)
+    )
+    for d in range(64)
+]
+# Colors in the palette returned by classiccolors() but not in the one
+# returned by websafecolors(); websafeDither() can leave these unchanged
+_VgaOnlyColors = {(0xC0, 0xC0, 0xC0)} | {
+    (r, g, b) for r in (0, 0x80) for g in (0, 0x80) for b in (0, 0x80)
+}
+# For each entry of _DitherMatrix, the value that each value from 0 through 255
+# becomes when dithered to 0, 128, or 255 (as in vgaPaletteDither())
+_VgaDither = [
+    bytes(
+        (
+            (128 if d < v * 64 // 128 else 0)
+            if v < 128
+            else (255 if d < (v - 128) * 64 // 127 else 128)
+        )
+        for v in range(256)
+    )
+    for d in range(64)
+]
+
 # Dithers in place the given image to the colors in color palette returned by websafecolors().
 # Image has the same format returned by the blankimage() method with the given value
 # of 'alpha' (default value for 'alpha' is False).
@@ -3490,27 +4176,32 @@ def websafeDither(image, width, height, alpha=False, includeVga=False):
     pixelSize = 4 if alpha else 3
     if len(image) < width * height * pixelSize:
         raise ValueError("len=%d width=%d height=%d" % (len(image), width, height))
+    if not includeVga:
+        _ditherchannels(image, width, height, pixelSize, _WebsafeDither)
+        return image
+    stride = width * pixelSize
     for y in range(height):
-        yp = y * width * pixelSize
-        for x in range(width):
-            xp = yp + x * pixelSize
-            if includeVga:
-                # Leave unchanged any colors in the VGA palette
-                # but not in the "safety palette".
-                c0 = image[xp]
-                if c0 == 0xC0:
-                    if image[xp + 1] == 0xC0 and image[xp + 2] == 0xC0:
-                        continue
-                elif c0 == 0x80 or c0 == 0:
-                    if (image[xp + 1] == 0 or image[xp + 1] == 0x80) and (
-                        image[xp + 2] == 0 or image[xp + 2] == 0x80
-                    ):
-                        continue
-            bdither = _DitherMatrix[(y & 7) * 8 + (x & 7)]
+        yp = y * stride
+        end = yp + stride
+        # Leave unchanged any colors in the VGA palette
+        # but not in the "safety palette".
+        row = zip(
+            image[yp:end:pixelSize],
+            image[yp + 1 : end : pixelSize],
+            image[yp + 2 : end : pixelSize],
+        )
+        keep = [px in _VgaOnlyColors for px in row]
+        anykept = True in keep
+        ditherrow = _DitherMatrix[(y & 7) * 8 : (y & 7) * 8 + 8]
+        for x in range(min(width, 8)):
+            table = _WebsafeDither[ditherrow[x]]
+            xkeep = keep[x::8]
             for i in range(3):
-                c = image[xp + i]
-                cm = c % 51
-                image[xp + i] = (c - cm) + 51 if bdither < cm * 64 // 51 else c - cm
+                sl = slice(yp + x * pixelSize + i, end, pixelSize * 8)
+                if anykept:
+                    image[sl] = [c if k else table[c] for c, k in zip(image[sl], xkeep)]
+                else:
+                    _translateslice(image, sl, table)
     return image
 
 def vgaPaletteDither(image, width, height, alpha=False):
@@ -3519,8 +4210,8 @@ def vgaPaletteDither(image, width, height, alpha=False):
         raise ValueError("len=%d width=%d height=%d" % (len(image), width, height))
     for y in range(height):
         yp = y * width * pixelSize
-        for x in range(width):
-            xp = yp + x * pixelSize
+        ditherrow = _DitherMatrix[(y & 7) * 8 : (y & 7) * 8 + 8]
+        for x, xp in enumerate(range(yp, yp + width * pixelSize, pixelSize)):
             r = image[xp]
             g = image[xp + 1]
             b = image[xp + 2]
@@ -3532,13 +4223,9 @@ def vgaPaletteDither(image, width, height, alpha=False):
                 or (r == 0 and b == g)
                 or (b == 0 and g == r)
             ):
-                bdither = _DitherMatrix[(y & 7) * 8 + (x & 7)]
+                table = _VgaDither[ditherrow[x & 7]]
                 for i in range(3):
-                    v = image[xp + i]
-                    if v < 128:
-                        image[xp + i] = 128 if bdither < v * 64 // 128 else 0
-                    else:
-                        image[xp + i] = 255 if bdither < (v - 128) * 64 // 127 else 128
+                    image[xp + i] = table[image[xp + i]]
             elif (
                 (g == 255 and b == 255)
                 or (r == 255 and b == 255)
@@ -3547,13 +4234,9 @@ def vgaPaletteDither(image, width, height, alpha=False):
                 or (r == 255 and b == g)
                 or (b == 255 and g == r)
             ):
-                bdither = _DitherMatrix[(y & 7) * 8 + (x & 7)]
+                table = _DitherTwoLevel[ditherrow[x & 7]]
                 for i in range(3):
-                    c = image[xp + i]
-                    cm = c
-                    image[xp + i] = (
-                        (c - cm) + 255 if bdither < cm * 64 // 255 else c - cm
-                    )
+                    image[xp + i] = table[image[xp + i]]
     return patternDither(image, width, height, classiccolors(), alpha=alpha)
 
 # Dithers in place the given image to the colors in an 8-bit color palette returned by ega8colors().
@@ -3566,15 +4249,7 @@ def eightColorDither(image, width, height, alpha=False):
         return
     if len(image) < width * height * pixelSize:
         raise ValueError("len=%d width=%d height=%d" % (len(image), width, height))
-    for y in range(height):
-        yp = y * width * pixelSize
-        for x in range(width):
-            xp = yp + x * pixelSize
-            bdither = _DitherMatrix[(y & 7) * 8 + (x & 7)]
-            for i in range(3):
-                c = image[xp + i]
-                cm = c
-                image[xp + i] = (c - cm) + 255 if bdither < cm * 64 // 255 else c - cm
+    _ditherchannels(image, width, height, pixelSize, _DitherTwoLevel)
     return image
 
 # Converts each color in the given image to the nearest color (in ordinary red&ndash;green&ndash;blue
@@ -3584,17 +4259,15 @@ def posterize(image, width, height, palette, alpha=False):
     pixelSize = 4 if alpha else 3
     if len(image) < width * height * pixelSize:
         raise ValueError("len=%d width=%d height=%d" % (len(image), width, height))
+    # Nearest palette color of each color found so far
+    nearest = {}
     for y in range(height):
         yp = y * width * pixelSize
-        for x in range(width):
-            xp = yp + x * pixelSize
-            canindex = _nearest_rgb3(
-                palette,
-                image[xp],
-                image[xp + 1],
-                image[xp + 2],
-            )
-            can = palette[canindex]
+        for xp in range(yp, yp + width * pixelSize, pixelSize):
+            t = (image[xp], image[xp + 1], image[xp + 2])
+            can = nearest.get(t)
+            if can is None:
+                can = nearest[t] = palette[_nearest_rgb3(palette, t[0], t[1], t[2])]
             image[xp] = can[0]
             image[xp + 1] = can[1]
             image[xp + 2] = can[2]
@@ -3607,69 +4280,81 @@ def floydSteinbergDither(image, width, height, palette, alpha=False):
         raise ValueError
     if width == 0 or height == 0:
         return image
-    err = [0 for i in range(width * 6)]
-    rerr1 = 0
-    rerr2 = rerr1 + width
-    gerr1 = rerr2 + width
-    gerr2 = gerr1 + width
-    berr1 = gerr2 + width
-    berr2 = berr1 + width
     pixelBytes = 4 if alpha else 3
-    pos = 0
+    # Nearest palette color of each color found so far
+    nearest = {}
+    if width == 1:
+        # No error is diffused in an image one pixel wide
+        for pos in range(0, height * pixelBytes, pixelBytes):
+            r = max(0, min(255, image[pos]))
+            g = max(0, min(255, image[pos + 1]))
+            b = max(0, min(255, image[pos + 2]))
+            can = palette[_nearest_rgb3(palette, r, g, b)]
+            image[pos] = can[0]
+            image[pos + 1] = can[1]
+            image[pos + 2] = can[2]
+        return image
+    # Error diffused to each pixel of the next row, a list per channel
+    rnext = [0] * width
+    gnext = [0] * width
+    bnext = [0] * width
     for j in range(height):
-        for i in range(width):
-            cr = (
-                getpixelalpha(image, width, height, i, j)
-                if alpha
-                else getpixel(image, width, height, i, j)
-            )
-            err[rerr1 + i] = err[rerr2 + i] + cr[0]
-            err[gerr1 + i] = err[gerr2 + i] + cr[1]
-            err[berr1 + i] = err[berr2 + i] + cr[2]
-            err[rerr2 + i] = err[gerr2 + i] = err[berr2 + i] = 0
-        err[rerr1] = max(0, min(255, err[rerr1]))
-        err[gerr1] = max(0, min(255, err[gerr1]))
-        err[berr1] = max(0, min(255, err[berr1]))
-        idx = _nearest_rgb3(palette, err[rerr1], err[gerr1], err[berr1])
-        pos = (j * width) * pixelBytes
-        image[pos] = palette[idx][0]
-        image[pos + 1] = palette[idx][1]
-        image[pos + 2] = palette[idx][2]
+        # Add each of the row's color components to the error carried over
+        # from the previous row, a channel at a time
+        rowpos = j * width * pixelBytes
+        rowend = rowpos + width * pixelBytes
+        rrow = [e + c for e, c in zip(rnext, image[rowpos:rowend:pixelBytes])]
+        grow = [e + c for e, c in zip(gnext, image[rowpos + 1 : rowend : pixelBytes])]
+        brow = [e + c for e, c in zip(bnext, image[rowpos + 2 : rowend : pixelBytes])]
+        # The error diffused to the next pixel of this row is carried in
+        # 'rright', 'gright', and 'bright'.  The error diffused to the next
+        # row is appended to 'rnext', 'gnext', and 'bnext' once complete;
+        # the error still accumulating for the columns below the previous
+        # and current pixels is in the 'prev' and 'cur' variables.  (The
+        # first error appended, for the column left of the row, is dropped.)
+        rnext = []
+        gnext = []
+        bnext = []
+        rright = gright = bright = 0
+        rprev = rcur = gprev = gcur = bprev = bcur = 0
+        pos = rowpos
+        # NOTE: The last pixel of each row is left unchanged.
         for i in range(width - 1):
-            err[rerr1 + i] = max(0, min(255, err[rerr1 + i]))
-            err[gerr1 + i] = max(0, min(255, err[gerr1 + i]))
-            err[berr1 + i] = max(0, min(255, err[berr1 + i]))
-            idx = _nearest_rgb3(palette, err[rerr1 + i], err[gerr1 + i], err[berr1 + i])
-            pos = (j * width + i) * pixelBytes
-            image[pos] = palette[idx][0]
-            image[pos + 1] = palette[idx][1]
-            image[pos + 2] = palette[idx][2]
-            rerr = err[rerr1 + i] - palette[idx][0]
-            gerr = err[gerr1 + i] - palette[idx][1]
-            berr = err[berr1 + i] - palette[idx][2]
+            r = rrow[i] + rright
+            g = grow[i] + gright
+            b = brow[i] + bright
+            r = 0 if r < 0 else (255 if r > 255 else r)
+            g = 0 if g < 0 else (255 if g > 255 else g)
+            b = 0 if b < 0 else (255 if b > 255 else b)
+            t = r | (g << 8) | (b << 16)
+            can = nearest.get(t)
+            if can is None:
+                can = nearest[t] = palette[_nearest_rgb3(palette, r, g, b)]
+            image[pos] = can[0]
+            image[pos + 1] = can[1]
+            image[pos + 2] = can[2]
+            pos += pixelBytes
+            rerr = r - can[0]
+            gerr = g - can[1]
+            berr = b - can[2]
             # diffuse red error
-            err[rerr1 + i + 1] += (rerr * 7) >> 4
-            err[rerr2 + i - 1] += (rerr * 3) >> 4
-            err[rerr2 + i] += (rerr * 5) >> 4
-            err[rerr2 + i + 1] += (rerr) >> 4
+            rright = (rerr * 7) >> 4
+            rnext.append(rprev + ((rerr * 3) >> 4))
+            rprev = rcur + ((rerr * 5) >> 4)
+            rcur = rerr >> 4
             # diffuse green error
-            err[gerr1 + i + 1] += (gerr * 7) >> 4
-            err[gerr2 + i - 1] += (gerr * 3) >> 4
-            err[gerr2 + i] += (gerr * 5) >> 4
-            err[gerr2 + i + 1] += (gerr) >> 4
-            # diffuse red error
-            err[berr1 + i + 1] += (berr * 7) >> 4
-            err[berr2 + i - 1] += (berr * 3) >> 4
-            err[berr2 + i] += (berr * 5) >> 4
-            err[berr2 + i + 1] += (berr) >> 4
-        err[rerr1] = max(0, min(255, err[rerr1]))
-        err[gerr1] = max(0, min(255, err[gerr1]))
-        err[berr1] = max(0, min(255, err[berr1]))
-        idx = _nearest_rgb3(palette, err[rerr1], err[gerr1], err[berr1])
-        pos = (j * width) * pixelBytes
-        image[pos] = palette[idx][0]
-        image[pos + 1] = palette[idx][1]
-        image[pos + 2] = palette[idx][2]
+            gright = (gerr * 7) >> 4
+            gnext.append(gprev + ((gerr * 3) >> 4))
+            gprev = gcur + ((gerr * 5) >> 4)
+            gcur = gerr >> 4
+            # diffuse blue error
+            bright = (berr * 7) >> 4
+            bnext.append(bprev + ((berr * 3) >> 4))
+            bprev = bcur + ((berr * 5) >> 4)
+            bcur = berr >> 4
+        rnext = rnext[1:] + [rprev, rcur]
+        gnext = gnext[1:] + [gprev, gcur]
+        bnext = bnext[1:] + [bprev, bcur]
     return image
 
 # Dithers in place the given image to the colors in an arbitrary color palette.
@@ -3692,76 +4377,66 @@ def floydSteinbergDither(image, width, height, palette, alpha=False):
 def patternDither(image, width, height, palette, alpha=False, fast=False):
     pixelSize = 4 if alpha else 3
     ditherMatrixLen = len(_DitherMatrix4x4) if fast else len(_DitherMatrix)
-    candidates = [[] for i in range(ditherMatrixLen)]
+    candidates = [0] * ditherMatrixLen
     paletteLum = [
         (can[0] * 2126 + can[1] * 7152 + can[2] * 722) // 10000 for can in palette
     ]
+    npal = len(palette)
+    # Sort key of the nearest palette color to each color tried so far; the key
+    # consists of gray value then palette index, packed into one integer
     trials = {}
-    numtrials = 0
-    numskips = 0
+    # Palette indices of the sorted candidates for each color of the image
+    # found so far, or an empty sequence if the color is in the palette;
+    # the candidates depend only on the color, not on the pixel's position
+    plans = {}
+    pack = bytes if npal <= 256 else tuple
     for y in range(height):
         yp = y * width * pixelSize
-        for x in range(width):
-            xp = yp + x * pixelSize
-            e = [0, 0, 0]
-            exact = False
+        ditherrow = (
+            _DitherMatrix4x4[(y & 3) * 4 : (y & 3) * 4 + 4]
+            if fast
+            else _DitherMatrix[(y & 7) * 8 : (y & 7) * 8 + 8]
+        )
+        ditherxmask = 3 if fast else 7
+        for x, xp in enumerate(range(yp, yp + width * pixelSize, pixelSize)):
             ir = image[xp]
             ig = image[xp + 1]
             ib = image[xp + 2]
-            for i in range(ditherMatrixLen):
-                # "// 4" is equiv. to "* 0.25" where 0.25
-                # is the dithering strength
-                t0 = ir + e[0] // 4
-                if t0 < 0:
-                    t0 = 0
-                if t0 > 255:
-                    t0 = 255
-                t1 = ig + e[1] // 4
-                if t1 < 0:
-                    t1 = 0
-                if t1 > 255:
-                    t1 = 255
-                t2 = ib + e[2] // 4
-                if t2 < 0:
-                    t2 = 0
-                if t2 > 255:
-                    t2 = 255
-                t = t0 | (t1 << 8) | (t2 << 16)
-                canvalue = None
-                numtrials += 1
-                if t in trials:
-                    numskips += 1
-                    canvalue = trials[t]
+            c = ir | (ig << 8) | (ib << 16)
+            plan = plans.get(c)
+            if plan is None:
+                er = eg = eb = 0
+                exact = False
+                for i in range(ditherMatrixLen):
+                    # "// 4" is equiv. to "* 0.25" where 0.25
+                    # is the dithering strength
+                    t0 = ir + er // 4
+                    t0 = 0 if t0 < 0 else (255 if t0 > 255 else t0)
+                    t1 = ig + eg // 4
+                    t1 = 0 if t1 < 0 else (255 if t1 > 255 else t1)
+                    t2 = ib + eb // 4
+                    t2 = 0 if t2 < 0 else (255 if t2 > 255 else t2)
+                    t = t0 | (t1 << 8) | (t2 << 16)
+                    key = trials.get(t)
+                    if key is None:
+                        canindex = _nearest_rgb3(palette, t0, t1, t2)
+                        key = trials[t] = paletteLum[canindex] * npal + canindex
+                    candidates[i] = key
+                    cv1 = palette[key % npal]
+                    if i == 0 and cv1[0] == ir and cv1[1] == ig and cv1[2] == ib:
+                        exact = True
+                        break
+                    er += ir - cv1[0]
+                    eg += ig - cv1[1]
+                    eb += ib - cv1[2]
+                if exact:
+                    plan = plans[c] = pack()
                 else:
-                    canindex = _nearest_rgb3(
-                        palette,
-                        t0,
-                        t1,
-                        t2,
-                    )
-                    can = palette[canindex]
-                    trials[t] = canvalue = [
-                        paletteLum[canindex],
-                        canindex,
-                    ]  # sort key consisting of gray value then color
-                candidates[i] = canvalue
-                cv1 = palette[canvalue[1]]
-                if i == 0 and cv1[0] == ir and cv1[1] == ig and cv1[2] == ib:
-                    exact = True
-                    break
-                e[0] += ir - cv1[0]
-                e[1] += ig - cv1[1]
-                e[2] += ib - cv1[2]
-            if exact:
+                    candidates.sort()
+                    plan = plans[c] = pack(k % npal for k in candidates)
+            if not plan:
                 continue
-            candidates.sort()
-            bdither = (
-                _DitherMatrix4x4[(y & 3) * 4 + (x & 3)]
-                if fast
-                else _DitherMatrix[(y & 7) * 8 + (x & 7)]
-            )
-            fcan = candidates[bdither][1]
-            fcan = palette[fcan]
+            fcan = palette[plan[ditherrow[x & ditherxmask]]]
             image[xp] = fcan[0]
             image[xp + 1] = fcan[1]
             image[xp + 2] = fcan[2]
@@ -3793,7 +4468,12 @@ def _gradient(stops, count=256):
     maxStop = stops[len(stops) - 1][0]
     if minStop < 0 or maxStop > 255 or minStop > maxStop:
         raise ValueError
-    ret = [None for i in range(count)]
+    ret = [None] * count
+    # Since the stops are sorted, the last stop pair that a position falls
+    # in is found by moving forward from the previous position's pair.
+    # That pair's first stop is at or before the position and its second
+    # stop is after it.
+    j = 0
     for i in range(count):
         p = i
         if p <= minStop:
@@ -3801,18 +4481,14 @@ def _gradient(stops, count=256):
         elif p >= maxStop:
             ret[i] = [x for x in stops[len(stops) - 1][1]]
         else:
-            for j in range(len(stops) - 1):
-                if p >= stops[j][0] and p <= stops[j + 1][0]:
-                    if stops[j][0] == stops[j + 1][0]:
-                        ret[i] = [x for x in stops[j][1]]
-                    else:
-                        sx = stops[j][0]
-                        sy = stops[j + 1][0]
-                        pos = (p - sx) / (sy - sx)
-                        ret[i] = [
-                            int(x + (y - x) * pos)
-                            for x, y in zip(stops[j][1], stops[j + 1][1])
-                        ]
+            while stops[j + 1][0] <= p:
+                j += 1
+            sx = stops[j][0]
+            sy = stops[j + 1][0]
+            pos = (p - sx) / (sy - sx)
+            ret[i] = [
+                int(x + (y - x) * pos) for x, y in zip(stops[j][1], stops[j + 1][1])
+            ]
     return ret
 
 # Returns a 256-element color gradient for coloring user-interface elements (for example,
@@ -3880,7 +4556,7 @@ def noiseimage(width=64, height=64):
     rarr = [0, 255, 192, 192, 192, 192, 192, 192, 128]
     image = []
     for y in range(height):
-        row = [0 for i in range(width * 3)]
+        row = [0] * (width * 3)
         for x in range(width):
             r = rarr[random.randint(0, len(rarr) - 1)]
             row[x * 3] = r
@@ -3898,7 +4574,7 @@ def whitenoiseimage(width=64, height=64):
         raise ValueError
     image = []
     for y in range(height):
-        row = [0 for i in range(width * 3)]
+        row = [0] * (width * 3)
         for x in range(width):
             r = random.randint(0, 255)
             row[x * 3] = r
@@ -3922,7 +4598,7 @@ def noiseimage2(width=64, height=64, bgcolor=None, noisecolor=None):
         noisecolor = [0, 0, 0]
     image = []
     for y in range(height):
-        row = [0 for i in range(width * 3)]
+        row = [0] * (width * 3)
         for x in range(width):
             r = noisecolor if random.randint(0, 63) < 8 else bgcolor
             row[x * 3] = r[0]
@@ -4217,15 +4893,19 @@ def imagerotaterow(image, width, height, y, offset=0, alpha=False):
 # the given value of 'alpha' (the default value for 'alpha' is False).
 def imagereversecolumnorder(image, width, height, alpha=False):
     pixelBytes = 4 if alpha else 3
+    scan = width * pixelBytes
     for y in range(height):
-        pixels = [
-            image[(y * width + x) * pixelBytes : (y * width + x + 1) * pixelBytes]
-            for x in range(width)
-        ]
-        pixels.reverse()
-        image[y * width * pixelBytes : (y + 1) * width * pixelBytes] = [
-            c for pixel in pixels for c in pixel
-        ]
+        # Reverse the row's components, then put each pixel's components
+        # back in order by swapping channels
+        row = image[y * scan : (y + 1) * scan]
+        row.reverse()
+        for c in range(pixelBytes // 2):
+            other = pixelBytes - 1 - c
+            row[c::pixelBytes], row[other::pixelBytes] = (
+                row[other::pixelBytes],
+                row[c::pixelBytes],
+            )
+        image[y * scan : (y + 1) * scan] = row
     return image
 
 # Reverses in place the order of rows in the given image.  Returns 'image'.
@@ -4305,10 +4985,10 @@ def endingRowsAreMirrored(image, width, height):
 def randomTruchetTiles(image, width, height, columns, rows):
     # "Truchet" means Sébastien Truchet
     if endingRowsAreMirrored(image, width, height):
-        altImage = imagereversecolumnorder([x for x in image], width, height)
+        altImage = imagereversecolumnorder(image[:], width, height)
         return randomtiles(columns, rows, [image, altImage], width, height)
     elif endingColumnsAreMirrored(image, width, height):
-        altImage = imagereverseroworder([x for x in image], width, height)
+        altImage = imagereverseroworder(image[:], width, height)
         return randomtiles(columns, rows, [image, altImage], width, height)
     else:
         raise ValueError("ending rows and ending columns are not mirrored")
@@ -4331,30 +5011,36 @@ def affine(
     smoothing=True,
 ):
     bypp = 4 if alpha else 3
+    if smoothing:
+        # Interpolate a row of destination pixels at a time
+        stride = dstwidth * bypp
+        for y in range(dstheight):
+            yp = y / srcheight
+            points = []
+            for x in range(dstwidth):
+                xp = x / srcwidth
+                tx = (xp * m11 + yp * m21) * srcwidth
+                ty = (xp * m12 + yp * m22) * srcheight
+                points.append((tx, ty))
+            dstimage[y * stride : (y + 1) * stride] = imagepts(
+                srcimage, srcwidth, srcheight, points, alpha=alpha
+            )
+        return dstimage
     for y in range(dstheight):
         yp = y / srcheight
         for x in range(dstwidth):
             xp = x / srcwidth
             tx = (xp * m11 + yp * m21) * srcwidth
             ty = (xp * m12 + yp * m22) * srcheight
-            if smoothing:
-                pixel = imagept(srcimage, srcwidth, srcheight, tx, ty, alpha=alpha)
-                if alpha:
-                    setpixelalpha(dstimage, dstwidth, dstheight, x, y, pixel)
-                else:
-                    setpixel(dstimage, dstwidth, dstheight, x, y, pixel)
-            else:
-                tx = int(tx) % srcwidth
-                ty = int(ty) % srcheight
-                dstindex = (y * dstwidth + x) * bypp
-                srcindex = (ty * srcwidth + tx) * bypp
-                if dstindex < 0 or dstindex > len(dstimage):
-                    raise ValueError([x, y, tx, ty])
-                if srcindex < 0 or srcindex > len(srcimage):
-                    raise ValueError([x, y, tx, ty])
-                dstimage[dstindex : dstindex + bypp] = srcimage[
-                    srcindex : srcindex + bypp
-                ]
+            tx = int(tx) % srcwidth
+            ty = int(ty) % srcheight
+            dstindex = (y * dstwidth + x) * bypp
+            srcindex = (ty * srcwidth + tx) * bypp
+            if dstindex < 0 or dstindex > len(dstimage):
+                raise ValueError([x, y, tx, ty])
+            if srcindex < 0 or srcindex > len(srcimage):
+                raise ValueError([x, y, tx, ty])
+            dstimage[dstindex : dstindex + bypp] = srcimage[srcindex : srcindex + bypp]
     return dstimage
 
 # Generates an image with a horizontal doubling of pixels.
@@ -4613,17 +5299,13 @@ class SvgDraw:
             raise ValueError
         if '"' in idstr:
             raise ValueError
-        image = blankimage(2, 2)
-        helper = ImageWraparoundDraw(image, 2, 2)
-        if hiltIsScrollbarColor:
-            helper.rect(0, 0, 2, 2, hilt)
-        # elif 256 or more colors and hilt is not white:
-        #    helper.rect(0, 0, 2, 2, [(a+b)//2 for a,b in zip(face, hilt)])
-        else:
-            helper.rect(0, 0, 1, 1, hilt)
-            helper.rect(1, 1, 2, 2, hilt)
-            helper.rect(0, 1, 1, 2, face)
-            helper.rect(1, 0, 2, 1, face)
+        # if 256 or more colors and hilt is not white:
+        #    image = [(a+b)//2 for a,b in zip(face, hilt)] * 4
+        # The 2 &times; 2 checkerboard of highlight and face colors, with the
+        # highlight color at the upper left, is built directly
+        hiltpixel = [hilt[0], hilt[1], hilt[2]]
+        facepixel = [face[0], face[1], face[2]]
+        image = hiltpixel + facepixel + facepixel + hiltpixel
         return svgimagepattern(idstr, image, 2, 2)
 
     def _ensurepattern(self, c1, c2):
@@ -5361,11 +6043,15 @@ def draw16button(
 
 # random wallpaper generation
 
+# Clamping is done by comparison rather than by calls to min() and max(),
+# since these are called for every pixel of a gradient fill
 def _togray255(x):
-    return int(abs(max(-1, min(1, x))) * 255.0)
+    x = abs(x)
+    return int(x * 255.0) if x <= 1 else 255
 
 def _togray64(x):
-    return int(abs(max(-1, min(1, x))) * 64.0)
+    x = abs(x)
+    return int(x * 64.0) if x <= 1 else 64
 
 def _diagcontour(x, y):
     if x > 1 or x < -1:
@@ -5420,8 +6106,10 @@ def _mindiagwrap(x, y):
 def _insetbox(x, y, contour):
     if x * 6.0 < 1 or y * 6.0 < 1 or x * 6 > 5 or y * 6 > 5:
         return contour(x, y)
-    x = min(1, max(0, 3 * x / 2 - 1 / 4))
-    y = min(1, max(0, 3 * y / 2 - 1 / 4))
+    x = 3 * x / 2 - 1 / 4
+    y = 3 * y / 2 - 1 / 4
+    x = 0 if x < 0 else (1 if x > 1 else x)
+    y = 0 if y < 0 else (1 if y > 1 else y)
     return contour(x, y)
 
 def _randomgradientfillex(width, height, palette, contour):